@@ -4,6 +4,6 @@ Provides utilities for storing data in S3 for the cryptocurrency sentiment analy
 
 __version__ = "0.1.0"
 
-from .save_to_s3 import save_to_s3
+from .save_to_s3 import get_s3_client, save_to_s3
 
-__all__ = ["save_to_s3"]
\ No newline at end of file
+__all__ = ["get_s3_client", "save_to_s3"]
\ No newline at end of file
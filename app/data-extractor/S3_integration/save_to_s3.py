@@ -5,10 +5,30 @@ import gzip
 import uuid
 import boto3
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Optional, Dict
 from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
 
+DEFAULT_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "10"))
+
+
+@lru_cache(maxsize=None)
+def _cached_s3_client(region_name: Optional[str], max_pool_connections: int):
+    cfg = Config(
+        retries={"max_attempts": 10, "mode": "standard"},
+        max_pool_connections=max_pool_connections,
+    )
+    if region_name:
+        return boto3.client("s3", region_name=region_name, config=cfg)
+    return boto3.client("s3", config=cfg)
+
+
+def get_s3_client(region_name: Optional[str] = None, max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS):
+    """Return a process-wide S3 client, created once per region and pool size."""
+    return _cached_s3_client(region_name or None, max_pool_connections)
+
+
 def save_to_s3(
     data: Any,
     source_name: str = "api_data",
@@ -24,11 +44,7 @@ def save_to_s3(
     if region_name is None:
         region_name = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")
     if s3_client is None:
-        cfg = Config(retries={"max_attempts": 10, "mode": "standard"})
-        if region_name:
-            s3_client = boto3.client("s3", region_name=region_name, config=cfg)
-        else:
-            s3_client = boto3.client("s3", config=cfg)
+        s3_client = get_s3_client(region_name)
 
     now = datetime.now(timezone.utc)
     ts = now.strftime("%Y-%m-%d_%H-%M-%S")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Measure per-call S3 client setup time: a fresh boto3 client per call (the old
+save_to_s3 behaviour) versus the cached client from get_s3_client().
+
+Usage (from app/data-extractor):
+    python -m benchmarks.bench_s3_client --calls 200
+"""
+
+import argparse
+import time
+
+import boto3
+from botocore.config import Config
+
+from utils.s3_utils import get_s3_client
+
+
+def per_call_ms(factory, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        factory()
+    return (time.perf_counter() - start) * 1000 / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--region", default="us-east-1")
+    args = parser.parse_args()
+
+    def fresh_client():
+        cfg = Config(retries={"max_attempts": 10, "mode": "standard"})
+        return boto3.client("s3", region_name=args.region, config=cfg)
+
+    start = time.perf_counter()
+    get_s3_client(args.region)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    fresh_ms = per_call_ms(fresh_client, args.calls)
+    cached_ms = per_call_ms(lambda: get_s3_client(args.region), args.calls)
+
+    print(f"fresh client per call:  {fresh_ms:8.3f} ms/call")
+    print(f"cached client (cold):   {cold_ms:8.3f} ms (first call only)")
+    print(f"cached client (warm):   {cached_ms:8.3f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,47 @@ import os
 
 COINS = ["bitcoin", "ethereum", "dogecoin"]
 CURRENCY = "usd"
+# Same aliases as the Spark job; used to pre-tag Reddit posts with coin mentions
+COIN_ALIASES = {
+    "bitcoin": ["bitcoin", "btc", "₿"],
+    "ethereum": ["ethereum", "eth", "ether"],
+    "solana": ["solana", "sol"],
+    "dogecoin": ["dogecoin", "doge"],
+    "cardano": ["cardano", "ada"],
+}
 
 S3_BUCKET = os.getenv("DATA_BUCKET_NAME", "sparkling-water-dev-data-bucket")
 PREFIX = "raw"
 COMPRESS = True
+# Extractor runs write one NDJSON object per source, split when a buffer reaches either limit
+S3_BATCH_MAX_RECORDS = int(os.getenv("S3_BATCH_MAX_RECORDS", "1000"))
+S3_BATCH_MAX_BYTES = int(os.getenv("S3_BATCH_MAX_BYTES", str(8 * 1024 * 1024)))
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "10"))
+# "json" writes gzip NDJSON, "parquet" columnar files with a fixed schema (needs pyarrow installed)
+RAW_OUTPUT_FORMAT = os.getenv("RAW_OUTPUT_FORMAT", "json")
 
 # Reddit settings
 SUBREDDITS = ["Bitcoin", "ethereum", "dogecoin"]
 POST_LIMIT = 20
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID", "")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET", "")
-REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "sparkling-water-bot")
\ No newline at end of file
+REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "sparkling-water-bot")
+# Incremental fetching: only posts newer than the per-subreddit checkpoint are emitted,
+# paging back up to REDDIT_BACKFILL_LIMIT posts when runs were missed
+REDDIT_INCREMENTAL = os.getenv("REDDIT_INCREMENTAL", "true").lower() == "true"
+REDDIT_BACKFILL_LIMIT = int(os.getenv("REDDIT_BACKFILL_LIMIT", "500"))
+REDDIT_CHECKPOINT_KEY = os.getenv("REDDIT_CHECKPOINT_KEY", "state/reddit_checkpoint.json")
+# Seen-post index ({post id: raw hour partition}) so each post is stored once; the Spark job reads it too
+POST_DEDUPE_ENABLED = os.getenv("POST_DEDUPE_ENABLED", "true").lower() == "true"
+SEEN_INDEX_KEY = os.getenv("SEEN_INDEX_KEY", "state/reddit_seen_ids.json")
+SEEN_INDEX_RETENTION_HOURS = int(os.getenv("SEEN_INDEX_RETENTION_HOURS", str(7 * 24)))
+# Saves are conditional on the index being unchanged since load; on a conflict it is re-read and merged
+SEEN_INDEX_SAVE_ATTEMPTS = int(os.getenv("SEEN_INDEX_SAVE_ATTEMPTS", "5"))
+
+# Extraction settings
+# "concurrent" fetches CoinGecko and every subreddit in parallel, "sequential" one after another
+EXTRACT_MODE = os.getenv("EXTRACT_MODE", "concurrent")
+EXTRACT_MAX_WORKERS = int(os.getenv("EXTRACT_MAX_WORKERS", "4"))
+# Per-request timeout for each source, and overall deadline for a concurrent run
+SOURCE_TIMEOUT_SECONDS = int(os.getenv("SOURCE_TIMEOUT_SECONDS", "20"))
+EXTRACT_TIMEOUT_SECONDS = int(os.getenv("EXTRACT_TIMEOUT_SECONDS", "120"))
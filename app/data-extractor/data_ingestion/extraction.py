@@ -0,0 +1,117 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import SUBREDDITS, EXTRACT_MAX_WORKERS, EXTRACT_TIMEOUT_SECONDS
+from fetchers.coingecko import fetch_prices
+from fetchers.reddit_fetcher import fetch_subreddit_posts, checkpoint_from_posts
+from utils.dedupe import SeenPostIndex
+from utils.s3_utils import BatchedS3Writer
+
+
+def _sources(checkpoint: Dict[str, Dict]) -> Dict[str, Callable[[], List[Dict]]]:
+    sources: Dict[str, Callable[[], List[Dict]]] = {"coingecko": fetch_prices}
+    for subreddit_name in SUBREDDITS:
+        sources[f"reddit/{subreddit_name}"] = partial(
+            fetch_subreddit_posts, subreddit_name, checkpoint=checkpoint.get(subreddit_name)
+        )
+    return sources
+
+
+def _target_source_name(source: str, record: Dict) -> str:
+    if source == "coingecko":
+        return f"coingecko/{record['coin']}"
+    return "reddit/cryptocurrency"
+
+
+def _timed_fetch(fetch: Callable[[], List[Dict]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        records = fetch()
+        error = None
+    except Exception as e:
+        records, error = [], e
+    return {"records": records, "error": error, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def _upload(writer: BatchedS3Writer, source: str, outcome: Dict[str, Any],
+            checkpoint: Dict[str, Dict], seen_index: Optional[SeenPostIndex] = None) -> Dict[str, Any]:
+    """
+    Write one source's records right away and return its report entry.
+
+    A subreddit's checkpoint only advances once its posts are uploaded. With
+    a `seen_index`, posts already stored by an earlier run (or by another
+    subreddit in this run) are skipped. A failed upload is reported as this
+    source's error, and its posts are taken out of the index again.
+    """
+    if outcome["error"] is not None:
+        print(f"❌ Failed to fetch {source}: {outcome['error']}")
+        return {"status": "error", "error": str(outcome["error"]), "latency_ms": outcome["latency_ms"]}
+
+    records, indexed, uploaded = outcome["records"], [], False
+    try:
+        if seen_index is not None and source.startswith("reddit/"):
+            records = indexed = seen_index.filter_unseen(records, writer.partition)
+        for record in records:
+            writer.add(record, source_name=_target_source_name(source, record))
+        writer.flush()
+        uploaded = True
+        if source.startswith("reddit/"):
+            newest = checkpoint_from_posts(outcome["records"])
+            if newest:
+                checkpoint[source[len("reddit/"):]] = newest
+    except Exception as e:
+        if not uploaded and indexed:
+            seen_index.forget(indexed)
+        print(f"❌ Failed to upload {source}: {e}")
+        return {"status": "error", "error": str(e), "latency_ms": outcome["latency_ms"]}
+    entry = {"status": "ok", "records": len(records), "latency_ms": outcome["latency_ms"]}
+    if len(records) != len(outcome["records"]):
+        entry["duplicates"] = len(outcome["records"]) - len(records)
+    return entry
+
+
+def extract_sequential(writer: BatchedS3Writer, checkpoint: Optional[Dict[str, Dict]] = None,
+                       seen_index: Optional[SeenPostIndex] = None) -> Dict[str, Dict[str, Any]]:
+    """Fetch and upload every source one after another."""
+    checkpoint = {} if checkpoint is None else checkpoint
+    return {
+        source: _upload(writer, source, _timed_fetch(fetch), checkpoint, seen_index)
+        for source, fetch in _sources(checkpoint).items()
+    }
+
+
+def extract_concurrent(
+    writer: BatchedS3Writer,
+    checkpoint: Optional[Dict[str, Dict]] = None,
+    max_workers: int = EXTRACT_MAX_WORKERS,
+    timeout: float = EXTRACT_TIMEOUT_SECONDS,
+    seen_index: Optional[SeenPostIndex] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch every source on a bounded thread pool and upload each one as soon as it completes.
+
+    Sources still running after `timeout` seconds are reported as timed out
+    instead of holding back the ones that already finished. `checkpoint` is
+    updated in place for every subreddit that was uploaded. Uploads run on
+    the calling thread, so `seen_index` needs no locking.
+    """
+    checkpoint = {} if checkpoint is None else checkpoint
+    report: Dict[str, Dict[str, Any]] = {}
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    submitted_at = time.perf_counter()
+    futures = {pool.submit(_timed_fetch, fetch): source for source, fetch in _sources(checkpoint).items()}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            source = futures[future]
+            report[source] = _upload(writer, source, future.result(), checkpoint, seen_index)
+    except FuturesTimeoutError:
+        # Uploads of the finished sources count against the deadline, so this can exceed `timeout`
+        elapsed_ms = round((time.perf_counter() - submitted_at) * 1000, 1)
+        for source in futures.values():
+            if source not in report:
+                print(f"❌ Timed out fetching {source} after {elapsed_ms / 1000:.1f}s")
+                report[source] = {"status": "timeout", "latency_ms": elapsed_ms}
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return report
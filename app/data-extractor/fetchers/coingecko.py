@@ -1,13 +1,13 @@
 import requests
 from datetime import datetime, timezone
 from typing import List, Dict
-from config.settings import COINS, CURRENCY
+from config.settings import COINS, CURRENCY, SOURCE_TIMEOUT_SECONDS
 
-def fetch_prices() -> List[Dict]:
+def fetch_prices(timeout: float = SOURCE_TIMEOUT_SECONDS) -> List[Dict]:
     """Fetch the latest crypto prices from the CoinGecko API."""
     url = "https://api.coingecko.com/api/v3/simple/price"
     params = {"ids": ",".join(COINS), "vs_currencies": CURRENCY}
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, timeout=timeout)
     response.raise_for_status()
     data = response.json()
     timestamp = datetime.now(timezone.utc).isoformat()
@@ -1,36 +1,90 @@
 import os
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import List, Dict, Optional
 import praw
-from config.settings import REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, SUBREDDITS, POST_LIMIT
+from config.settings import (
+    REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, SUBREDDITS, POST_LIMIT, COIN_ALIASES,
+    SOURCE_TIMEOUT_SECONDS, REDDIT_BACKFILL_LIMIT,
+)
+from utils.coin_matcher import tag_coin_mentions
+
+def get_reddit_client(timeout: int = SOURCE_TIMEOUT_SECONDS) -> praw.Reddit:
+    """Create a Reddit API client. PRAW clients are not thread safe, so use one per thread."""
+    return praw.Reddit(
+        client_id=REDDIT_CLIENT_ID,
+        client_secret=REDDIT_CLIENT_SECRET,
+        user_agent=REDDIT_USER_AGENT,
+        timeout=timeout,
+    )
+
+
+def _to_record(post, subreddit_name: str) -> Dict:
+    return {
+        "id": post.id,
+        "title": post.title,
+        "text": post.selftext,
+        "subreddit": subreddit_name,
+        "timestamp": datetime.fromtimestamp(post.created_utc, tz=timezone.utc).isoformat(),
+        "upvotes": post.score,
+        "num_comments": post.num_comments,
+        "coin_mentions": tag_coin_mentions(COIN_ALIASES, subreddit_name, post.title, post.selftext),
+    }
+
+
+def fetch_subreddit_posts(
+    subreddit_name: str,
+    reddit: Optional[praw.Reddit] = None,
+    checkpoint: Optional[Dict] = None,
+    backfill_limit: int = REDDIT_BACKFILL_LIMIT,
+) -> List[Dict]:
+    """
+    Fetch the latest posts of a single subreddit.
+
+    Without a checkpoint this returns the newest POST_LIMIT posts. With one
+    (see checkpoint_from_posts) it pages back through /new until it reaches
+    the checkpointed post and returns only newer posts, at most
+    `backfill_limit` of them when earlier runs were missed.
+    """
+    if reddit is None:
+        reddit = get_reddit_client()
+
+    subreddit = reddit.subreddit(subreddit_name)
+    if not checkpoint:
+        return [_to_record(post, subreddit_name) for post in subreddit.new(limit=POST_LIMIT)]
+
+    results: List[Dict] = []
+    # PRAW pages with `after` under the hood; posts arrive newest first
+    for post in subreddit.new(limit=backfill_limit):
+        if post.fullname == checkpoint["fullname"] or post.created_utc < checkpoint["created_utc"]:
+            break
+        results.append(_to_record(post, subreddit_name))
+    return results
+
+
+def checkpoint_from_posts(posts: List[Dict]) -> Optional[Dict]:
+    """High-water mark (newest fullname and created_utc) for a batch of fetched posts."""
+    if not posts:
+        return None
+    newest = max(posts, key=lambda post: post["timestamp"])
+    return {
+        "fullname": f"t3_{newest['id']}",
+        "created_utc": datetime.fromisoformat(newest["timestamp"]).timestamp(),
+    }
+
 
 def fetch_reddit_posts() -> List[Dict]:
     """
     Fetch the latest posts from the configured subreddits using Reddit API.
 
     Returns:
-        List[Dict]: Each dict contains post id, title, text, subreddit, timestamp, upvotes, and number of comments.
+        List[Dict]: Each dict contains post id, title, text, subreddit, timestamp, upvotes, number of comments,
+        and coin_mentions (mention count per coin).
     """
-    reddit = praw.Reddit(
-        client_id=REDDIT_CLIENT_ID,
-        client_secret=REDDIT_CLIENT_SECRET,
-        user_agent=REDDIT_USER_AGENT
-    )
+    reddit = get_reddit_client()
 
     results: List[Dict] = []
-
     for subreddit_name in SUBREDDITS:
-        subreddit = reddit.subreddit(subreddit_name)
-        for post in subreddit.new(limit=POST_LIMIT):
-            results.append({
-                "id": post.id,
-                "title": post.title,
-                "text": post.selftext,
-                "subreddit": subreddit_name,
-                "timestamp": datetime.fromtimestamp(post.created_utc, tz=timezone.utc).isoformat(),
-                "upvotes": post.score,
-                "num_comments": post.num_comments
-            })
+        results.extend(fetch_subreddit_posts(subreddit_name, reddit))
 
     return results
 
@@ -1,18 +1,34 @@
-from fetchers.coingecko import fetch_prices
-from fetchers.reddit_fetcher import fetch_reddit_posts
-from utils.s3_utils import save_to_s3
+from config.settings import EXTRACT_MODE, REDDIT_INCREMENTAL, POST_DEDUPE_ENABLED
+from data_ingestion.extraction import extract_concurrent, extract_sequential
+from utils.checkpoint import load_checkpoint, save_checkpoint
+from utils.dedupe import SeenPostIndex
+from utils.s3_utils import BatchedS3Writer
 
 def handle(event, context):
-    data = fetch_prices()
-    for entry in data:
-        coin_name = entry["coin"]
-        save_to_s3(entry, source_name=f"coingecko/{coin_name}")
+    checkpoint = load_checkpoint() if REDDIT_INCREMENTAL else {}
+    previous_checkpoint = dict(checkpoint)
+    seen_index = SeenPostIndex.load() if POST_DEDUPE_ENABLED else None
 
-    reddit_posts = fetch_reddit_posts()
-    for post in reddit_posts:
-        save_to_s3(post, source_name=f"reddit/cryptocurrency")
+    with BatchedS3Writer() as writer:
+        if EXTRACT_MODE == "sequential":
+            sources = extract_sequential(writer, checkpoint, seen_index)
+        else:
+            sources = extract_concurrent(writer, checkpoint, seen_index=seen_index)
+
+    # Save the index after the uploads so a failed run never hides posts it did not store
+    if seen_index is not None:
+        seen_index.prune()
+        if seen_index.changed:
+            seen_index.save()
+
+    if REDDIT_INCREMENTAL and checkpoint != previous_checkpoint:
+        save_checkpoint(checkpoint)
+
+    if not any(source["status"] == "ok" for source in sources.values()):
+        raise RuntimeError(f"Every source failed: {sources}")
 
     return {
         "statusCode": 200,
-        "body": "Data extracted and saved successfully!"
+        "body": f"Data extracted and saved successfully! ({len(writer.results)} objects written)",
+        "sources": sources,
     }
@@ -0,0 +1,89 @@
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from botocore.exceptions import ClientError
+
+from utils.checkpoint import StateConflict
+from utils.dedupe import SeenPostIndex, partition_of
+
+KEY = "state/reddit_seen_ids.json"
+# Recent hours, so the prune on a retried save keeps them
+NOW = datetime.now(timezone.utc)
+H10, H11, H12 = (partition_of(NOW - timedelta(hours=hours)) for hours in (3, 2, 1))
+
+
+class StubS3:
+    """One versioned object store honouring IfMatch / IfNoneMatch like S3 conditional writes."""
+
+    def __init__(self, stored=None):
+        self.body = None if stored is None else json.dumps(stored)
+        self.version = 0 if stored is None else 1
+        self.puts = 0
+
+    def _etag(self):
+        return f'"v{self.version}"'
+
+    def get_object(self, Bucket, Key):
+        if self.body is None:
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        return {'Body': io.BytesIO(self.body.encode()), 'ETag': self._etag()}
+
+    def put_object(self, Bucket, Key, Body, ContentType, IfMatch=None, IfNoneMatch=None):
+        if (IfNoneMatch == "*" and self.body is not None) or (IfMatch is not None and IfMatch != self._etag()):
+            raise ClientError({'Error': {'Code': 'PreconditionFailed'}}, 'PutObject')
+        self.body, self.version, self.puts = Body.decode(), self.version + 1, self.puts + 1
+        return {'ETag': self._etag()}
+
+    def stored(self):
+        return json.loads(self.body)
+
+
+def test_save_is_conditional_on_the_loaded_etag():
+    s3 = StubS3({"a": H10})
+    index = SeenPostIndex.load(KEY, s3)
+    index.filter_unseen([{"id": "b"}], H11)
+
+    index.save(KEY, s3)
+
+    assert s3.stored() == {"a": H10, "b": H11}
+    assert index.etag == '"v2"'
+
+
+def test_concurrent_saves_merge_instead_of_overwriting():
+    s3 = StubS3({"a": H10})
+    first, second = SeenPostIndex.load(KEY, s3), SeenPostIndex.load(KEY, s3)
+    first.filter_unseen([{"id": "b"}, {"id": "shared"}], H11)
+    second.filter_unseen([{"id": "c"}, {"id": "shared"}], H12)
+
+    first.save(KEY, s3)
+    second.save(KEY, s3)
+
+    # The post both runs stored stays under the partition saved first
+    assert s3.stored() == {"a": H10, "b": H11, "c": H12, "shared": H11}
+
+
+def test_first_save_of_a_new_index_is_conditional_too():
+    s3 = StubS3()
+    first, second = SeenPostIndex.load(KEY, s3), SeenPostIndex.load(KEY, s3)
+    first.filter_unseen([{"id": "a"}], H10)
+    second.filter_unseen([{"id": "b"}], H10)
+
+    first.save(KEY, s3)
+    second.save(KEY, s3)
+
+    assert s3.stored() == {"a": H10, "b": H10}
+
+
+def test_save_gives_up_after_the_configured_attempts():
+    class AlwaysChanged(StubS3):
+        def put_object(self, **kwargs):
+            raise ClientError({'Error': {'Code': 'PreconditionFailed'}}, 'PutObject')
+
+    s3 = AlwaysChanged({})
+    index = SeenPostIndex.load(KEY, s3)
+    index.filter_unseen([{"id": "a"}], H10)
+
+    with pytest.raises(StateConflict):
+        index.save(KEY, s3, attempts=3)
@@ -0,0 +1,70 @@
+import threading
+import time
+
+from data_ingestion import extraction
+from utils.dedupe import SeenPostIndex
+
+
+class StubWriter:
+    partition = "2026/10/17/00"
+
+    def add(self, record, source_name):
+        pass
+
+    def flush(self):
+        pass
+
+
+def test_timed_out_source_reports_its_real_elapsed_time(monkeypatch):
+    release = threading.Event()
+
+    def slow_upload(writer, source, outcome, checkpoint, seen_index=None):
+        time.sleep(0.3)
+        return {"status": "ok", "records": 0, "latency_ms": outcome["latency_ms"]}
+
+    monkeypatch.setattr(extraction, "_sources", lambda checkpoint: {
+        "coingecko": lambda: [],
+        "reddit/stuck": lambda: release.wait(5) and [],
+    })
+    monkeypatch.setattr(extraction, "_upload", slow_upload)
+    try:
+        report = extraction.extract_concurrent(StubWriter(), timeout=0.1)
+    finally:
+        release.set()
+
+    assert report["coingecko"]["status"] == "ok"
+    assert report["reddit/stuck"]["status"] == "timeout"
+    # The upload of coingecko ran past the deadline, so the stuck source waited longer than `timeout`
+    assert report["reddit/stuck"]["latency_ms"] >= 300
+
+
+class FailingWriter(StubWriter):
+    """Fails every upload of the "reddit/bad" posts."""
+
+    def __init__(self):
+        self.stored = []
+
+    def add(self, record, source_name):
+        if record["id"].startswith("bad"):
+            raise RuntimeError("SlowDown")
+        self.stored.append(record["id"])
+
+
+def _posts(prefix):
+    return [{"id": f"{prefix}{i}", "timestamp": "2026-10-17T00:00:00+00:00"} for i in range(2)]
+
+
+def test_failed_upload_is_reported_for_its_source_only(monkeypatch):
+    sources = {"coingecko": lambda: [], "reddit/bad": lambda: _posts("bad"), "reddit/good": lambda: _posts("good")}
+    monkeypatch.setattr(extraction, "_sources", lambda checkpoint: sources)
+    monkeypatch.setattr(extraction, "checkpoint_from_posts", lambda posts: None)
+
+    for extract in (extraction.extract_sequential, extraction.extract_concurrent):
+        writer, seen_index = FailingWriter(), SeenPostIndex()
+        report = extract(writer, seen_index=seen_index)
+
+        assert report["reddit/bad"]["status"] == "error" and "SlowDown" in report["reddit/bad"]["error"]
+        assert report["reddit/good"]["status"] == "ok" and report["coingecko"]["status"] == "ok"
+        assert writer.stored == ["good0", "good1"]
+        # The failed posts are not indexed, so the next run stores them
+        assert set(seen_index.seen) == {"good0", "good1"}
@@ -0,0 +1,69 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+from botocore.exceptions import BotoCoreError, ClientError
+from config.settings import S3_BUCKET, REDDIT_CHECKPOINT_KEY
+from utils.s3_utils import get_s3_client
+
+
+class StateConflict(RuntimeError):
+    """A conditional save found the state object changed since it was loaded."""
+
+
+def load_json_state_with_etag(key: str, s3_client: Optional[Any] = None) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Load a small JSON state object and its ETag; an absent object yields ({}, None)."""
+    s3_client = s3_client or get_s3_client()
+    try:
+        response = s3_client.get_object(Bucket=S3_BUCKET, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return {}, None
+        raise RuntimeError(f"Failed to load state s3://{S3_BUCKET}/{key}: {e}")
+    except BotoCoreError as e:
+        raise RuntimeError(f"Failed to load state s3://{S3_BUCKET}/{key}: {e}")
+    return json.loads(response["Body"].read().decode("utf-8")), response.get("ETag")
+
+
+def load_json_state(key: str, s3_client: Optional[Any] = None) -> Dict[str, Any]:
+    """Load a small JSON state object from the bucket; an absent object yields an empty dict."""
+    return load_json_state_with_etag(key, s3_client)[0]
+
+
+def save_json_state(state: Dict[str, Any], key: str, s3_client: Optional[Any] = None,
+                    conditional: bool = False, etag: Optional[str] = None) -> Optional[str]:
+    """
+    Write a small JSON state object and return its new ETag.
+
+    With `conditional` the write only succeeds if the object still has
+    `etag` (or, with no etag, still does not exist), and StateConflict is
+    raised otherwise.
+    """
+    s3_client = s3_client or get_s3_client()
+    kwargs = {}
+    if conditional:
+        kwargs = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+    try:
+        response = s3_client.put_object(
+            Bucket=S3_BUCKET,
+            Key=key,
+            Body=json.dumps(state, sort_keys=True, separators=(",", ":")).encode("utf-8"),
+            ContentType="application/json; charset=utf-8",
+            **kwargs,
+        )
+    except ClientError as e:
+        # 409 ConditionalRequestConflict is returned when another conditional write is in flight
+        if conditional and e.response.get("Error", {}).get("Code") in ("PreconditionFailed", "ConditionalRequestConflict"):
+            raise StateConflict(f"State s3://{S3_BUCKET}/{key} changed since it was loaded")
+        raise RuntimeError(f"Failed to save state s3://{S3_BUCKET}/{key}: {e}")
+    except BotoCoreError as e:
+        raise RuntimeError(f"Failed to save state s3://{S3_BUCKET}/{key}: {e}")
+    return response.get("ETag")
+
+
+def load_checkpoint(key: str = REDDIT_CHECKPOINT_KEY, s3_client: Optional[Any] = None) -> Dict[str, Dict[str, Any]]:
+    """Load the per-subreddit high-water marks; an absent checkpoint yields an empty dict."""
+    return load_json_state(key, s3_client)
+
+
+def save_checkpoint(checkpoint: Dict[str, Dict[str, Any]], key: str = REDDIT_CHECKPOINT_KEY,
+                    s3_client: Optional[Any] = None) -> None:
+    save_json_state(checkpoint, key, s3_client)
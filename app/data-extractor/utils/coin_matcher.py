@@ -0,0 +1,108 @@
+"""
+Aho-Corasick matcher for coin aliases.
+
+Standalone (standard library only) so the same module is used by the extractor
+for pre-tagging posts and shipped to the Spark job through spark.submit.pyFiles.
+"""
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class CoinAliasMatcher:
+    """Counts whole-word alias mentions for every coin in a single pass over the text."""
+
+    def __init__(self, coin_aliases: Mapping[str, Sequence[str]]):
+        self.coins = list(coin_aliases)
+        # Node 0 is the root; each node has transitions, a failure link and (coin, alias length) outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, int]]] = [[]]
+
+        for coin, aliases in coin_aliases.items():
+            for alias in aliases:
+                alias = alias.lower()
+                if alias:
+                    self._add(alias, coin)
+        self._build_failure_links()
+
+    def _add(self, alias: str, coin: str):
+        node = 0
+        for ch in alias:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if (coin, len(alias)) not in self._out[node]:
+            self._out[node].append((coin, len(alias)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def count_mentions(self, text: Any) -> Dict[str, int]:
+        """Return {coin: mention count} for aliases appearing as whole words in `text`."""
+        if not isinstance(text, str) or not text:
+            return {}
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        counts: Dict[str, int] = {}
+        node = 0
+        last = len(text) - 1
+        for end, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            if end < last and _is_word_char(text[end + 1]):
+                continue
+            for coin, length in out[node]:
+                start = end - length + 1
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    counts[coin] = counts.get(coin, 0) + 1
+        return counts
+
+    def tag(self, subreddit: Any, title: Any, text: Any) -> Dict[str, int]:
+        """
+        Mention counts over title and text; the coin named by the subreddit is
+        always tagged, with a count of 0 if the post itself never mentions it.
+        """
+        title = title if isinstance(title, str) else ""
+        text = text if isinstance(text, str) else ""
+        counts = self.count_mentions(f"{title} {text}")
+        if isinstance(subreddit, str) and subreddit.lower() in self.coins:
+            counts.setdefault(subreddit.lower(), 0)
+        return counts
+
+
+@lru_cache(maxsize=8)
+def _cached_matcher(frozen_aliases: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> CoinAliasMatcher:
+    return CoinAliasMatcher(dict(frozen_aliases))
+
+
+def get_matcher(coin_aliases: Mapping[str, Sequence[str]]) -> CoinAliasMatcher:
+    """Matcher for `coin_aliases`, built once per process and reused afterwards."""
+    return _cached_matcher(tuple((coin, tuple(aliases)) for coin, aliases in coin_aliases.items()))
+
+
+def tag_coin_mentions(coin_aliases: Mapping[str, Sequence[str]], subreddit: Any, title: Any, text: Any) -> Dict[str, int]:
+    """Plain-function entry point used by the extractor to pre-tag posts."""
+    return get_matcher(coin_aliases).tag(subreddit, title, text)
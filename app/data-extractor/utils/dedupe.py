@@ -0,0 +1,82 @@
+"""
+Seen-post index shared by the extractor and the Spark job.
+
+The index is a JSON object {post id: "YYYY/MM/DD/HH"} mapping every stored
+Reddit post to the raw hour partition holding it. The extractor drops posts
+that are already indexed, and the Spark job ignores any copy of a post that
+sits outside its indexed partition, so each post is stored, scored and
+counted once. Entries older than the retention window are pruned.
+
+Overlapping runs both load the index, so saves are conditional on the
+object's ETag from load. A run that loses the race re-reads the index,
+adds the posts it indexed itself (keeping the other run's partition for a
+post both stored) and tries again.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from config.settings import SEEN_INDEX_KEY, SEEN_INDEX_RETENTION_HOURS, SEEN_INDEX_SAVE_ATTEMPTS
+from utils.checkpoint import StateConflict, load_json_state_with_etag, save_json_state
+
+
+def partition_of(dt: datetime) -> str:
+    return f"{dt.year:04d}/{dt.month:02d}/{dt.day:02d}/{dt.hour:02d}"
+
+
+class SeenPostIndex:
+    def __init__(self, seen: Optional[Dict[str, str]] = None, etag: Optional[str] = None):
+        self.seen: Dict[str, str] = dict(seen or {})
+        # ETag of the stored index this one was loaded from; None when there was none
+        self.etag = etag
+        # Posts indexed by this run, re-applied if a concurrent save wins
+        self.added: Dict[str, str] = {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, key: str = SEEN_INDEX_KEY, s3_client: Optional[Any] = None) -> "SeenPostIndex":
+        return cls(*load_json_state_with_etag(key, s3_client))
+
+    def save(self, key: str = SEEN_INDEX_KEY, s3_client: Optional[Any] = None,
+             attempts: int = SEEN_INDEX_SAVE_ATTEMPTS) -> None:
+        """Write the index unless it changed since load; otherwise merge the stored one in and retry."""
+        for attempt in range(1, attempts + 1):
+            try:
+                self.etag = save_json_state(self.seen, key, s3_client, conditional=True, etag=self.etag)
+                break
+            except StateConflict:
+                if attempt == attempts:
+                    raise
+                stored, self.etag = load_json_state_with_etag(key, s3_client)
+                self.seen = {**self.added, **stored}
+                self.prune()
+        self.added = {}
+        self.changed = False
+
+    def filter_unseen(self, posts: List[Dict], partition: str) -> List[Dict]:
+        """Return the posts not indexed yet (first copy wins) and index them under `partition`."""
+        unseen = []
+        for post in posts:
+            if post["id"] in self.seen:
+                continue
+            self.seen[post["id"]] = partition
+            self.added[post["id"]] = partition
+            unseen.append(post)
+        if unseen:
+            self.changed = True
+        return unseen
+
+    def forget(self, posts: List[Dict]) -> None:
+        """Undo filter_unseen for posts that were not stored after all, so a later run stores them."""
+        for post in posts:
+            if self.added.pop(post["id"], None) is not None:
+                del self.seen[post["id"]]
+
+    def prune(self, now: Optional[datetime] = None, retention_hours: int = SEEN_INDEX_RETENTION_HOURS) -> int:
+        """Drop entries whose partition is older than the retention window; returns how many."""
+        now = now or datetime.now(timezone.utc)
+        cutoff = partition_of(now - timedelta(hours=retention_hours))
+        expired = [post_id for post_id, partition in self.seen.items() if partition < cutoff]
+        for post_id in expired:
+            del self.seen[post_id]
+        if expired:
+            self.changed = True
+        return len(expired)
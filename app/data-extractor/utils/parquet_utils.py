@@ -0,0 +1,64 @@
+"""
+Parquet encoding for raw extractor records.
+
+The Arrow schemas mirror REDDIT_POST_SCHEMA and COINGECKO_PRICE_SCHEMA in
+spark_jobs/schemas.py, so the Spark job reads these files without casting.
+pyarrow is only needed when RAW_OUTPUT_FORMAT is "parquet".
+"""
+import io
+from functools import lru_cache
+from typing import Any, Dict, List
+
+
+@lru_cache(maxsize=None)
+def _schemas():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise RuntimeError("RAW_OUTPUT_FORMAT=parquet requires pyarrow; add it to requirements.txt") from e
+
+    return {
+        "reddit": pa.schema([
+            ("id", pa.string()),
+            ("title", pa.string()),
+            ("text", pa.string()),
+            ("subreddit", pa.string()),
+            ("timestamp", pa.string()),
+            ("upvotes", pa.int64()),
+            ("num_comments", pa.int64()),
+            ("coin_mentions", pa.map_(pa.string(), pa.int32())),
+        ]),
+        "coingecko": pa.schema([
+            ("coin", pa.string()),
+            ("price_usd", pa.float64()),
+            ("timestamp", pa.string()),
+        ]),
+    }
+
+
+def schema_for(source_name: str):
+    """Return the fixed Arrow schema for a source such as "reddit/cryptocurrency" or "coingecko/bitcoin"."""
+    kind = source_name.split("/", 1)[0]
+    try:
+        return _schemas()[kind]
+    except KeyError:
+        raise ValueError(f"No Parquet schema for source '{source_name}'")
+
+
+def encode_parquet(records: List[Dict[str, Any]], source_name: str) -> bytes:
+    """Encode records as one snappy-compressed Parquet file; fields outside the schema are dropped."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = schema_for(source_name)
+    rows = [
+        {
+            name: (list(record[name].items()) if isinstance(record.get(name), dict) else record.get(name))
+            for name in schema.names
+        }
+        for record in records
+    ]
+    table = pa.Table.from_pylist(rows, schema=schema)
+    buf = io.BytesIO()
+    pq.write_table(table, buf, compression="snappy")
+    return buf.getvalue()
@@ -4,42 +4,72 @@ import gzip
 import uuid
 import boto3
 from datetime import datetime, timezone
+from functools import lru_cache
 from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
-from typing import Any, Dict
-from config.settings import S3_BUCKET, PREFIX, COMPRESS
+from typing import Any, Dict, Iterable, List, Optional
+from config.settings import (
+    S3_BUCKET, PREFIX, COMPRESS, S3_BATCH_MAX_RECORDS, S3_BATCH_MAX_BYTES, S3_MAX_POOL_CONNECTIONS,
+    RAW_OUTPUT_FORMAT,
+)
+from utils.parquet_utils import encode_parquet
+
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
 
-def save_to_s3(
-    data: Any,
-    source_name: str,
-    compress: bool = COMPRESS,
-) -> Dict[str, Any]:
-    """Uploads JSON data to S3 with optional gzip compression."""
-    cfg = Config(retries={"max_attempts": 10, "mode": "standard"})
-    s3_client = boto3.client("s3", config=cfg)
 
+@lru_cache(maxsize=None)
+def _cached_s3_client(region_name: Optional[str], max_pool_connections: int):
+    cfg = Config(
+        retries={"max_attempts": 10, "mode": "standard"},
+        max_pool_connections=max_pool_connections,
+    )
+    if region_name:
+        return boto3.client("s3", region_name=region_name, config=cfg)
+    return boto3.client("s3", config=cfg)
+
+
+def get_s3_client(region_name: Optional[str] = None, max_pool_connections: int = S3_MAX_POOL_CONNECTIONS):
+    """
+    Return the process-wide S3 client for this region and pool size.
+
+    Clients are created once and reused across calls (and across warm Lambda
+    invocations), so credential resolution, endpoint setup and TLS
+    connections are not repeated for every object.
+    """
+    return _cached_s3_client(region_name or None, max_pool_connections)
+
+
+def _build_key(source_name: str, compress: bool, hour: Optional[datetime] = None,
+               ext: Optional[str] = None) -> str:
     now = datetime.now(timezone.utc)
     ts = now.strftime("%Y-%m-%d_%H-%M-%S")
     ms = f"{int(now.microsecond/1000):03d}"
     rand = uuid.uuid4().hex[:8]
-    date_path = f"{now.year:04d}/{now.month:02d}/{now.day:02d}/{now.hour:02d}"
-    ext = "json.gz" if compress else "json"
-    key = f"{PREFIX}/{source_name}/{date_path}/{ts}-{ms}-{rand}.{ext}"
+    partition_time = hour or now
+    date_path = f"{partition_time.year:04d}/{partition_time.month:02d}/{partition_time.day:02d}/{partition_time.hour:02d}"
+    ext = ext or ("json.gz" if compress else "json")
+    return f"{PREFIX}/{source_name}/{date_path}/{ts}-{ms}-{rand}.{ext}"
+
+
+def _encode(payload: str, compress: bool) -> bytes:
+    if not compress:
+        return payload.encode("utf-8")
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb") as gz:
+        gz.write(payload.encode("utf-8"))
+    return buf.getvalue()
 
-    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
-    if compress:
-        buf = io.BytesIO()
-        with gzip.GzipFile(fileobj=buf, mode="wb") as gz:
-            gz.write(payload.encode("utf-8"))
-        body_bytes = buf.getvalue()
-    else:
-        body_bytes = payload.encode("utf-8")
+
+def _put(key: str, body_bytes: bytes, content_type: str, compress: bool,
+         s3_client: Optional[Any] = None) -> Dict[str, Any]:
+    if s3_client is None:
+        s3_client = get_s3_client()
 
     put_kwargs = {
         "Bucket": S3_BUCKET,
         "Key": key,
         "Body": body_bytes,
-        "ContentType": "application/json; charset=utf-8",
+        "ContentType": content_type,
     }
     if compress:
         put_kwargs["ContentEncoding"] = "gzip"
@@ -50,3 +80,134 @@ def save_to_s3(
         return {"bucket": S3_BUCKET, "key": key, "size_bytes": len(body_bytes)}
     except (BotoCoreError, ClientError) as e:
         raise RuntimeError(f"Failed to upload to S3: {e}")
+
+
+def save_to_s3(
+    data: Any,
+    source_name: str,
+    compress: bool = COMPRESS,
+    s3_client: Optional[Any] = None,
+    output_format: str = RAW_OUTPUT_FORMAT,
+) -> Dict[str, Any]:
+    """
+    Uploads JSON data to S3 with optional gzip compression.
+
+    With output_format="parquet" the record (or list of records) is written
+    as one Parquet file with the source's fixed schema instead.
+    """
+    if output_format == "parquet":
+        return _save_parquet(data if isinstance(data, list) else [data], source_name, s3_client)
+    key = _build_key(source_name, compress)
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return _put(key, _encode(payload, compress), "application/json; charset=utf-8", compress, s3_client)
+
+
+def _to_json_line(record: Any) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def _save_ndjson(lines: List[str], source_name: str, compress: bool,
+                 s3_client: Optional[Any] = None, hour: Optional[datetime] = None) -> Dict[str, Any]:
+    key = _build_key(source_name, compress, hour)
+    body_bytes = _encode("\n".join(lines), compress)
+    result = _put(key, body_bytes, "application/x-ndjson; charset=utf-8", compress, s3_client)
+    result["record_count"] = len(lines)
+    return result
+
+
+def _save_parquet(records: List[Any], source_name: str, s3_client: Optional[Any] = None,
+                  hour: Optional[datetime] = None) -> Dict[str, Any]:
+    key = _build_key(source_name, False, hour, ext="parquet")
+    # Parquet pages are already snappy-compressed, so no gzip Content-Encoding
+    result = _put(key, encode_parquet(records, source_name), PARQUET_CONTENT_TYPE, False, s3_client)
+    result["record_count"] = len(records)
+    return result
+
+
+def save_records_to_s3(
+    records: Iterable[Any],
+    source_name: str,
+    compress: bool = COMPRESS,
+    s3_client: Optional[Any] = None,
+    output_format: str = RAW_OUTPUT_FORMAT,
+) -> Dict[str, Any]:
+    """Uploads records to a single S3 object as newline-delimited JSON (or Parquet)."""
+    if output_format == "parquet":
+        return _save_parquet(list(records), source_name, s3_client)
+    return _save_ndjson([_to_json_line(record) for record in records], source_name, compress, s3_client)
+
+
+class BatchedS3Writer:
+    """
+    Buffers records per source_name and writes each buffer as one NDJSON
+    (or, with output_format="parquet", one Parquet) object.
+
+    A buffer is flushed when it reaches `max_records` records or `max_bytes`
+    of serialized JSON, and every remaining buffer is flushed on flush() or
+    when the writer is used as a context manager and exits. All objects of
+    one writer land in the hour partition it was created in (`partition`).
+    """
+
+    def __init__(
+        self,
+        compress: bool = COMPRESS,
+        max_records: int = S3_BATCH_MAX_RECORDS,
+        max_bytes: int = S3_BATCH_MAX_BYTES,
+        s3_client: Optional[Any] = None,
+        output_format: str = RAW_OUTPUT_FORMAT,
+    ):
+        if max_records <= 0 or max_bytes <= 0:
+            raise ValueError("Batch thresholds must be positive integers.")
+        if output_format not in ("json", "parquet"):
+            raise ValueError(f"Unsupported output format '{output_format}'")
+        self.compress = compress
+        self.output_format = output_format
+        self.s3_client = s3_client
+        self.started_at = datetime.now(timezone.utc)
+        self.partition = (
+            f"{self.started_at.year:04d}/{self.started_at.month:02d}/"
+            f"{self.started_at.day:02d}/{self.started_at.hour:02d}"
+        )
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.results: List[Dict[str, Any]] = []
+        # Serialized lines for JSON, the records themselves for Parquet
+        self._buffers: Dict[str, List[Any]] = {}
+        self._buffer_bytes: Dict[str, int] = {}
+
+    def add(self, record: Any, source_name: str) -> Optional[Dict[str, Any]]:
+        """Buffer a record; returns the upload result if this filled the buffer."""
+        line = _to_json_line(record)
+        buffer = self._buffers.setdefault(source_name, [])
+        buffer.append(record if self.output_format == "parquet" else line)
+        self._buffer_bytes[source_name] = self._buffer_bytes.get(source_name, 0) + len(line.encode("utf-8")) + 1
+        if len(buffer) >= self.max_records or self._buffer_bytes[source_name] >= self.max_bytes:
+            return self._flush_source(source_name)
+        return None
+
+    def _flush_source(self, source_name: str) -> Optional[Dict[str, Any]]:
+        buffered = self._buffers.pop(source_name, None)
+        self._buffer_bytes.pop(source_name, None)
+        if not buffered:
+            return None
+        if self.output_format == "parquet":
+            result = _save_parquet(buffered, source_name, self.s3_client, self.started_at)
+        else:
+            result = _save_ndjson(buffered, source_name, self.compress, self.s3_client, self.started_at)
+        self.results.append(result)
+        return result
+
+    def flush(self) -> List[Dict[str, Any]]:
+        return [
+            result
+            for result in (self._flush_source(source_name) for source_name in list(self._buffers))
+            if result is not None
+        ]
+
+    def __enter__(self) -> "BatchedS3Writer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Keep what was fetched even if a later fetch failed
+        self.flush()
+        return False
@@ -1,22 +1,29 @@
 """Streamlit dashboard for visualizing crypto sentiment and price data."""
 from __future__ import annotations
 
+import math
 import os
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import boto3
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import BotoCoreError, ClientError
 from streamlit_autorefresh import st_autorefresh
 
+from downsampling import downsample
+from item_store import IncrementalItemStore
+
 DEFAULT_REGION = os.getenv("AWS_REGION", "us-east-1")
 DEFAULT_PROFILE = os.getenv("AWS_PROFILE")
 COIN_ORDER = ["bitcoin", "ethereum", "dogecoin"]
+# Partition keys queried for the sidebar's range; coins without items in it are not offered
+DASHBOARD_COINS = [c.strip().lower() for c in os.getenv("DASHBOARD_COINS", ",".join(COIN_ORDER)).split(",") if c.strip()]
 COIN_NAME_MAP: Dict[str, str] = {
     "bitcoin": "Bitcoin",
     "ethereum": "Ethereum",
@@ -26,7 +33,28 @@ REQUIRED_COLUMNS = {"coin", "sentiment_label", "sentiment_score", "price_usd", "
 NUMERIC_COLUMNS = ["sentiment_score", "price_usd", "price_sample_count"]
 DATETIME_COLUMNS = ["current_ts", "timestamp"]
 DEFAULT_DYNAMO_TABLE = os.getenv("PROCESSED_DATA_TABLE", "sparkling-water-dev-crypto-sentiment")
-DEFAULT_DYNAMO_LIMIT = int(os.getenv("DYNAMO_SCAN_LIMIT", "2500"))
+DEFAULT_DYNAMO_LIMIT = int(os.getenv("DYNAMO_QUERY_LIMIT", os.getenv("DYNAMO_SCAN_LIMIT", "2500")))
+DYNAMO_QUERY_CONCURRENCY = int(os.getenv("DYNAMO_QUERY_CONCURRENCY", "4"))
+DEFAULT_LOOKBACK_DAYS = int(os.getenv("DASHBOARD_LOOKBACK_DAYS", "7"))
+# Incremental item store: rows older than the max age are evicted, and refreshes re-read the
+# newest hours again (the Spark job rewrites an hour when late posts arrive)
+STORE_MAX_AGE_DAYS = int(os.getenv("DASHBOARD_STORE_MAX_AGE_DAYS", "30"))
+STORE_REFRESH_OVERLAP_HOURS = int(os.getenv("DASHBOARD_STORE_OVERLAP_HOURS", "3"))
+STORE_MIN_REFRESH_SECONDS = int(os.getenv("DASHBOARD_STORE_MIN_REFRESH_SECONDS", "30"))
+# Charts are downsampled to a few points per pixel column of this width (half of it for the
+# charts in the two-column row); Streamlit does not report the browser's viewport server-side
+DEFAULT_CHART_WIDTH_PX = int(os.getenv("DASHBOARD_CHART_WIDTH_PX", "1200"))
+# Only the attributes the charts and tables use are read back
+PROJECTED_COLUMNS = ["coin", "current_ts", "price_usd", "price_sample_count", "sentiment_label", "sentiment_score"]
+# Hourly/daily rollups written by the Spark job; KPIs are merged from these instead of raw items
+DEFAULT_ROLLUP_TABLE = os.getenv("ROLLUP_DATA_TABLE", "sparkling-water-dev-crypto-sentiment-rollups")
+ROLLUP_SUM_FIELDS = [
+    "post_count", "scored_count", "sentiment_sum", "sentiment_sq_sum",
+    "positive_count", "negative_count", "neutral_count", "price_sum", "price_sample_count",
+    "point_count", "point_price_sum", "point_price_sq_sum", "point_score_sum", "point_score_sq_sum", "point_cross_sum",
+]
+# current_ts / bucket_ts sort keys, as written by the Spark job
+KEY_TS_FORMAT = "%Y-%m-%dT%H:%M:%S"
 
 
 def _get_dynamo_table(table_name: str):
@@ -46,7 +74,22 @@ def _coerce_datetime_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def _convert(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, list):
+        return [_convert(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _convert(v) for k, v in value.items()}
+    return value
+
+
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # The Spark job leaves out sentiment_score for hours without a scored post
+    for col_name in NUMERIC_COLUMNS:
+        if col_name not in df.columns:
+            df[col_name] = float("nan")
+
     missing = REQUIRED_COLUMNS.difference(df.columns)
     if missing:
         missing_str = ", ".join(sorted(missing))
@@ -71,67 +114,174 @@ def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df.reset_index(drop=True)
 
 
-@st.cache_data(show_spinner=False, ttl=300)
-def load_data_from_dynamo(table_name: str, scan_limit: int) -> pd.DataFrame:
-    if not table_name:
-        raise ValueError("DynamoDB table name is required.")
-    if scan_limit <= 0:
-        raise ValueError("Scan limit must be a positive integer.")
-
+def _query_coin(table_name: str, coin: str, start_key: str, end_key: str,
+                limit: Optional[int]) -> List[Dict[str, object]]:
+    """Newest-first items of one coin with current_ts in [start_key, end_key], up to `limit` (None for all)."""
+    # One resource per call: boto3 resources must not be shared across threads
     table = _get_dynamo_table(table_name)
+    query_kwargs = {
+        "KeyConditionExpression": Key("coin").eq(coin) & Key("current_ts").between(start_key, end_key),
+        "ProjectionExpression": ", ".join(f"#{name}" for name in PROJECTED_COLUMNS),
+        "ExpressionAttributeNames": {f"#{name}": name for name in PROJECTED_COLUMNS},
+        "ScanIndexForward": False,
+    }
     items: List[Dict[str, object]] = []
-    last_evaluated_key = None
-    retrieved = 0
-
     try:
-        while retrieved < scan_limit:
-            batch_limit = min(scan_limit - retrieved, 1000)
-            if batch_limit <= 0:
-                break
-            scan_kwargs = {"Limit": batch_limit}
-            if last_evaluated_key:
-                scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
-            response = table.scan(**scan_kwargs)
-            batch = response.get("Items", [])
-            items.extend(batch)
-            retrieved += len(batch)
-            last_evaluated_key = response.get("LastEvaluatedKey")
-            if not last_evaluated_key:
+        while limit is None or len(items) < limit:
+            query_kwargs["Limit"] = 1000 if limit is None else min(limit - len(items), 1000)
+            response = table.query(**query_kwargs)
+            items.extend(response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
                 break
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
     except (ClientError, BotoCoreError) as exc:
-        raise RuntimeError(f"Failed to scan DynamoDB table {table_name}: {exc}") from exc
+        raise RuntimeError(f"Failed to query DynamoDB table {table_name}: {exc}") from exc
+    return [{k: _convert(v) for k, v in item.items()} for item in items]
+
+
+@st.cache_resource(show_spinner=False)
+def get_item_store(table_name: str) -> IncrementalItemStore:
+    """One store per table, shared by every session of this server process."""
+    return IncrementalItemStore(
+        query=lambda coin, start_key, end_key, limit: _query_coin(table_name, coin, start_key, end_key, limit),
+        normalize=_normalize_columns,
+        max_age_days=STORE_MAX_AGE_DAYS,
+        overlap_hours=STORE_REFRESH_OVERLAP_HOURS,
+        min_refresh_seconds=STORE_MIN_REFRESH_SECONDS,
+        concurrency=DYNAMO_QUERY_CONCURRENCY,
+    )
+
+
+def load_data_from_dynamo(table_name: str, coins: Tuple[str, ...], start_key: str, end_key: str,
+                          limit_per_coin: int) -> Dict[str, pd.DataFrame]:
+    """
+    {coin: items with current_ts in [start_key, end_key]}, newest `limit_per_coin` per coin.
 
-    if not items:
+    Served from the process-wide store, which only queries items newer than
+    what it already holds. Each frame is a timestamp-sorted, read-only slice.
+    """
+    if not table_name:
+        raise ValueError("DynamoDB table name is required.")
+    if limit_per_coin <= 0:
+        raise ValueError("Item limit must be a positive integer.")
+    if not coins:
+        raise ValueError("At least one coin is required.")
+
+    partitions = get_item_store(table_name).refresh(coins, start_key, end_key, limit_per_coin)
+    if not partitions:
         raise RuntimeError(
-            "No records returned from DynamoDB. Ensure the table contains processed data."
+            "No records returned from DynamoDB for the selected range. "
+            "Ensure the table contains processed data or widen the date range."
         )
+    return partitions
+
+
+def _rollup_ranges(start_ts: pd.Timestamp, end_ts: pd.Timestamp) -> List[Tuple[str, pd.Timestamp, pd.Timestamp]]:
+    """
+    Cover the hours starting in [start_ts, end_ts] with as few rollups as possible:
+    daily buckets for whole days, hourly buckets for the partial days at either end.
+    """
+    first_hour = start_ts.ceil(timedelta(hours=1))
+    last_hour = end_ts.floor(timedelta(hours=1))
+    if first_hour > last_hour:
+        return []
+    first_day = first_hour.ceil(timedelta(days=1))
+    end_day = (last_hour + timedelta(hours=1)).floor(timedelta(days=1))
+    if first_day >= end_day:
+        return [("hour", first_hour, last_hour)]
+
+    ranges = []
+    if first_hour < first_day:
+        ranges.append(("hour", first_hour, first_day - timedelta(hours=1)))
+    ranges.append(("day", first_day, end_day - timedelta(days=1)))
+    if end_day <= last_hour:
+        ranges.append(("hour", end_day, last_hour))
+    return ranges
 
-    def _convert(value):
-        if isinstance(value, Decimal):
-            return float(value)
-        if isinstance(value, list):
-            return [_convert(v) for v in value]
-        if isinstance(value, dict):
-            return {k: _convert(v) for k, v in value.items()}
-        return value
 
-    normalized_items = [{k: _convert(v) for k, v in item.items()} for item in items]
-    df = pd.DataFrame(normalized_items)
-    return _normalize_columns(df)
+@st.cache_data(show_spinner=False, ttl=300)
+def load_rollups(table_name: str, coin_key: str, granularity: str, start_key: str, end_key: str) -> pd.DataFrame:
+    """Query one coin's rollups of one granularity with bucket_ts in [start_key, end_key]."""
+    table = _get_dynamo_table(table_name)
+    query_kwargs = {
+        "KeyConditionExpression": Key("series").eq(f"{coin_key}#{granularity}")
+        & Key("bucket_ts").between(start_key, end_key),
+    }
+    items: List[Dict[str, object]] = []
+    try:
+        while True:
+            response = table.query(**query_kwargs)
+            items.extend(response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                break
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    except (ClientError, BotoCoreError) as exc:
+        raise RuntimeError(f"Failed to query rollup table {table_name}: {exc}") from exc
+    return pd.DataFrame([{k: _convert(v) for k, v in item.items()} for item in items])
+
+
+def load_rollups_for_range(table_name: str, coin_key: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp) -> pd.DataFrame:
+    frames = [
+        load_rollups(table_name, coin_key, granularity, first.strftime(KEY_TS_FORMAT), last.strftime(KEY_TS_FORMAT))
+        for granularity, first, last in _rollup_ranges(start_ts, end_ts)
+    ]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True).sort_values("bucket_ts")
+
+
+def summarize_rollups(rollups: pd.DataFrame) -> Dict[str, object]:
+    """
+    Merge rollups into the dashboard's summary: sentiment mean and standard deviation
+    over posts, label counts, range OHLC and the hourly price/sentiment correlation.
+    """
+    totals = rollups.reindex(columns=ROLLUP_SUM_FIELDS).apply(pd.to_numeric, errors="coerce").fillna(0).sum()
+
+    scored = totals["scored_count"]
+    avg_sentiment = totals["sentiment_sum"] / scored if scored else float("nan")
+    sentiment_std = (
+        math.sqrt(max(totals["sentiment_sq_sum"] / scored - avg_sentiment ** 2, 0.0)) if scored else float("nan")
+    )
 
+    correlation: Optional[float] = None
+    points = totals["point_count"]
+    if points > 1:
+        mean_price = totals["point_price_sum"] / points
+        mean_score = totals["point_score_sum"] / points
+        var_price = totals["point_price_sq_sum"] / points - mean_price ** 2
+        var_score = totals["point_score_sq_sum"] / points - mean_score ** 2
+        if var_price > 0 and var_score > 0:
+            covariance = totals["point_cross_sum"] / points - mean_price * mean_score
+            correlation = max(-1.0, min(1.0, covariance / math.sqrt(var_price * var_score)))
+
+    ohlc = {}
+    for field in ("price_open", "price_high", "price_low", "price_close"):
+        values = rollups[field].dropna() if field in rollups.columns else pd.Series(dtype=float)
+        ohlc[field] = values if not values.empty else None
+    distribution = pd.DataFrame(
+        {
+            "sentiment_label": ["Positive", "Neutral", "Negative"],
+            "count": [int(totals["positive_count"]), int(totals["neutral_count"]), int(totals["negative_count"])],
+        }
+    )
+    return {
+        "post_count": int(totals["post_count"]),
+        "avg_sentiment": avg_sentiment,
+        "sentiment_std": sentiment_std,
+        "correlation": correlation,
+        "distribution": distribution[distribution["count"] > 0],
+        "price_open": ohlc["price_open"].iloc[0] if ohlc["price_open"] is not None else None,
+        "price_high": ohlc["price_high"].max() if ohlc["price_high"] is not None else None,
+        "price_low": ohlc["price_low"].min() if ohlc["price_low"] is not None else None,
+        "price_close": ohlc["price_close"].iloc[-1] if ohlc["price_close"] is not None else None,
+    }
 
-def _compute_date_range(df: pd.DataFrame) -> Tuple[datetime, datetime]:
-    """Return min/max timestamps with slight padding for UI controls."""
-    if "timestamp" not in df.columns or df["timestamp"].isna().all():
-        now = pd.Timestamp.utcnow()
-        return (now - timedelta(days=7), now)
 
-    min_ts = df["timestamp"].min()
-    max_ts = df["timestamp"].max()
-    if pd.isna(min_ts) or pd.isna(max_ts):
-        now = pd.Timestamp.utcnow()
-        return (now - timedelta(days=7), now)
-    return (min_ts.to_pydatetime(), max_ts.to_pydatetime())
+def _default_date_range(lookback_days: int = DEFAULT_LOOKBACK_DAYS) -> Tuple[datetime, datetime]:
+    """Return the last `lookback_days` up to the end of the current UTC hour, for the UI controls."""
+    now = pd.Timestamp.now(tz="UTC").floor(timedelta(hours=1)) + timedelta(minutes=59)
+    return ((now - timedelta(days=lookback_days)).to_pydatetime(), now.to_pydatetime())
 
 
 def _format_sentiment_label(label: str) -> str:
@@ -166,54 +316,36 @@ if auto_refresh:
     st_autorefresh(interval=refresh_interval_seconds * 1000, limit=None, key="auto_refresh_counter")
 
 dynamo_table = st.sidebar.text_input("Table name", value=DEFAULT_DYNAMO_TABLE)
+rollup_table = st.sidebar.text_input(
+    "Rollup table",
+    value=DEFAULT_ROLLUP_TABLE,
+    help="Hourly/daily aggregates used for the KPIs; leave empty to compute them from the loaded items.",
+)
 dynamo_limit = st.sidebar.slider(
-    "Max items to fetch",
+    "Max items per coin",
     min_value=100,
     max_value=5000,
     value=min(DEFAULT_DYNAMO_LIMIT, 2000),
     step=100,
-    help="Adjust to balance load vs. fidelity."
+    help="Newest items are kept when a coin has more in the selected range."
+)
+
+chart_width_px = st.sidebar.slider(
+    "Chart width (px)",
+    min_value=400,
+    max_value=3840,
+    value=DEFAULT_CHART_WIDTH_PX,
+    step=80,
+    help="Width of your screen's charts; every series is reduced to its min/max per pixel column.",
 )
 
 reload_requested = st.sidebar.button("Clear cache & reload")
 if reload_requested:
-    load_data_from_dynamo.clear()
+    get_item_store(dynamo_table.strip() or DEFAULT_DYNAMO_TABLE).clear()
+    load_rollups.clear()
     st.rerun()
 
-try:
-    dataset = load_data_from_dynamo(dynamo_table.strip() or DEFAULT_DYNAMO_TABLE, int(dynamo_limit))
-except Exception as err:  
-    st.error(str(err))
-    st.stop()
-
-coin_options = (
-    dataset[["coin_key", "coin_display"]]
-    .drop_duplicates()
-    .sort_values("coin_display")
-)
-
-preferred_display_order: List[str] = []
-for coin in COIN_ORDER:
-    matches = coin_options.loc[coin_options["coin_key"] == coin, "coin_display"].tolist()
-    preferred_display_order.extend(matches)
-
-remaining_displays = [
-    display
-    for display in coin_options["coin_display"].tolist()
-    if display not in preferred_display_order
-]
-coin_display_options = preferred_display_order + sorted(remaining_displays)
-
-if not coin_display_options:
-    st.error("No coins available in the dataset.")
-    st.stop()
-
-selected_coin_display = st.sidebar.selectbox("Select coin", options=coin_display_options)
-selected_coin_key = (
-    coin_options.loc[coin_options["coin_display"] == selected_coin_display, "coin_key"].iloc[0]
-)
-
-min_date, max_date = _compute_date_range(dataset)
+min_date, max_date = _default_date_range()
 
 # Create datetime range inputs with separate date and time inputs
 st.sidebar.markdown("**DateTime range**")
@@ -224,7 +356,6 @@ with start_col1:
     start_date = st.date_input(
         "Date",
         value=min_date.date(),
-        min_value=min_date.date(),
         max_value=max_date.date(),
         help="Select start date",
         key="start_date"
@@ -243,7 +374,6 @@ with end_col1:
     end_date = st.date_input(
         "Date",
         value=max_date.date(),
-        min_value=min_date.date(),
         max_value=max_date.date(),
         help="Select end date",
         key="end_date"
@@ -264,49 +394,82 @@ end_datetime = datetime.combine(end_date, end_time)
 if start_datetime > end_datetime:
     start_datetime, end_datetime = end_datetime, start_datetime
 
-mask_coin = dataset["coin_key"] == selected_coin_key
-if "timestamp" in dataset.columns:
-    # Convert to timezone-aware datetime for comparison
-    start_ts = pd.Timestamp(start_datetime, tz='UTC')
-    end_ts = pd.Timestamp(end_datetime, tz='UTC')
-    mask_date = dataset["timestamp"].between(start_ts, end_ts, inclusive='both')
-else:
-    mask_date = pd.Series(True, index=dataset.index)
+# Convert to timezone-aware datetime for comparison
+start_ts = pd.Timestamp(start_datetime, tz='UTC')
+end_ts = pd.Timestamp(end_datetime, tz='UTC')
 
-filtered = dataset.loc[mask_coin & mask_date].copy()
+try:
+    partitions = load_data_from_dynamo(
+        dynamo_table.strip() or DEFAULT_DYNAMO_TABLE,
+        tuple(DASHBOARD_COINS),
+        start_ts.strftime(KEY_TS_FORMAT),
+        end_ts.strftime(KEY_TS_FORMAT),
+        int(dynamo_limit),
+    )
+except Exception as err:  
+    st.error(str(err))
+    st.stop()
+
+coin_displays = {coin_key: frame["coin_display"].iat[0] for coin_key, frame in partitions.items()}
+preferred_coins = [coin for coin in COIN_ORDER if coin in coin_displays]
+remaining_coins = sorted(
+    (coin for coin in coin_displays if coin not in preferred_coins), key=coin_displays.get
+)
+coin_key_options = preferred_coins + remaining_coins
+
+if not coin_key_options:
+    st.error("No coins available in the dataset.")
+    st.stop()
+
+selected_coin_key = st.sidebar.selectbox(
+    "Select coin", options=coin_key_options, format_func=coin_displays.get
+)
+
+# Timestamp-sorted slice of the coin's partition, already bounded to the selected range;
+# it is shared with the item store, so everything below only reads it
+filtered = partitions[selected_coin_key]
 
 if filtered.empty:
     st.warning("No records match the current selections. Try expanding the filters.")
     st.stop()
 
-# Use raw filtered data instead of aggregating by hour
-plot_data = filtered.copy()
-if "timestamp" in plot_data.columns:
-    plot_data = plot_data.sort_values("timestamp")
-
-sentiment_distribution = (
-    filtered.groupby("sentiment_label").size().rename("count").reset_index()
-)
-sentiment_distribution["sentiment_label"] = sentiment_distribution["sentiment_label"].apply(
-    _format_sentiment_label
-)
+rollup_summary = None
+if rollup_table.strip():
+    try:
+        rollups = load_rollups_for_range(rollup_table.strip(), selected_coin_key, start_ts, end_ts)
+        if not rollups.empty:
+            rollup_summary = summarize_rollups(rollups)
+    except RuntimeError as err:
+        st.sidebar.warning(f"{err} Falling back to the loaded items.")
+
+if rollup_summary is not None:
+    # Post counts per label over the whole range
+    sentiment_distribution = rollup_summary["distribution"]
+else:
+    sentiment_distribution = (
+        filtered.groupby("sentiment_label").size().rename("count").reset_index()
+    )
+    sentiment_distribution["sentiment_label"] = sentiment_distribution["sentiment_label"].apply(
+        _format_sentiment_label
+    )
 
-# Remove sentiment trend aggregation - use raw data
-sentiment_trend_data = pd.DataFrame()
-if "timestamp" in filtered.columns:
-    sentiment_trend_data = filtered[["timestamp", "sentiment_score"]].dropna().sort_values("timestamp")
+sentiment_trend_data = downsample(filtered, "timestamp", "sentiment_score", chart_width_px // 2)
 
 correlation = pd.NA
-price_sentiment_df = filtered[["price_usd", "sentiment_score"]].dropna()
-if not price_sentiment_df.empty and price_sentiment_df.shape[0] > 1:
-    correlation = price_sentiment_df.corr().iloc[0, 1]
-
-if "timestamp" in filtered.columns:
-    latest_row = filtered.sort_values("timestamp").iloc[-1]
+if rollup_summary is not None:
+    if rollup_summary["correlation"] is not None:
+        correlation = rollup_summary["correlation"]
 else:
-    latest_row = filtered.iloc[-1]
+    price_sentiment_df = filtered[["price_usd", "sentiment_score"]].dropna()
+    if not price_sentiment_df.empty and price_sentiment_df.shape[0] > 1:
+        correlation = price_sentiment_df.corr().iloc[0, 1]
+
+latest_row = filtered.iloc[-1]
 latest_price = latest_row.get("price_usd", float("nan"))
-avg_sentiment = filtered["sentiment_score"].mean()
+if rollup_summary is not None:
+    avg_sentiment = rollup_summary["avg_sentiment"]
+else:
+    avg_sentiment = filtered["sentiment_score"].mean()
 price_sample_count = latest_row.get("price_sample_count")
 
 st.title("Sparkling Water: Crypto Sentiment Intelligence Dashboard")
@@ -329,16 +492,24 @@ else:
 
 if price_sample_count is not None and not pd.isna(price_sample_count):
     st.caption(f"Price sample count for latest hour: {int(price_sample_count)}")
+if rollup_summary is not None:
+    caption = (
+        f"Range summary from rollups: {rollup_summary['post_count']:,} posts, "
+        f"sentiment σ {rollup_summary['sentiment_std']:.2f}"
+    )
+    if rollup_summary["price_open"] is not None and rollup_summary["price_close"] is not None:
+        caption += (
+            f", price O/H/L/C {rollup_summary['price_open']:,.2f} / {rollup_summary['price_high']:,.2f}"
+            f" / {rollup_summary['price_low']:,.2f} / {rollup_summary['price_close']:,.2f}"
+        )
+    st.caption(caption)
 
 # Dual-axis price vs sentiment chart
-if not plot_data.empty and "timestamp" in plot_data.columns:
-    # Use raw data points instead of aggregated hourly data
-    plot_subset = plot_data[["timestamp", "price_usd", "sentiment_score"]].dropna(subset=["timestamp"])
-    
+if not filtered.empty:
     fig_price_sentiment = go.Figure()
     
-    # Plot raw price data
-    price_data = plot_subset[["timestamp", "price_usd"]].dropna(subset=["price_usd"])
+    # Price series, reduced to a few points per pixel column
+    price_data = downsample(filtered, "timestamp", "price_usd", chart_width_px)
     if not price_data.empty:
         fig_price_sentiment.add_trace(
             go.Scatter(
@@ -351,8 +522,8 @@ if not plot_data.empty and "timestamp" in plot_data.columns:
             )
         )
     
-    # Plot raw sentiment data
-    sentiment_data = plot_subset[["timestamp", "sentiment_score"]].dropna(subset=["sentiment_score"])
+    # Sentiment series, reduced the same way
+    sentiment_data = downsample(filtered, "timestamp", "sentiment_score", chart_width_px)
     if not sentiment_data.empty:
         fig_price_sentiment.add_trace(
             go.Scatter(
@@ -424,8 +595,8 @@ with col_right:
 st.subheader("Sentiment highlights")
 highlights_col1, highlights_col2 = st.columns(2)
 
-positive_records = filtered.dropna(subset=["sentiment_score"]).nlargest(5, "sentiment_score")
-negative_records = filtered.dropna(subset=["sentiment_score"]).nsmallest(5, "sentiment_score")
+positive_records = filtered.loc[filtered["sentiment_score"].nlargest(5).index]
+negative_records = filtered.loc[filtered["sentiment_score"].nsmallest(5).index]
 
 
 def _render_record(record: pd.Series) -> str:
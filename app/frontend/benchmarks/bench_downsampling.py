@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Time the dashboard's chart downsampling (downsampling.py).
+
+For synthetic series of increasing length this prints the reduction time
+next to the size of the Plotly figure built from the raw and the reduced
+series. What the reduction keeps is covered by tests/test_downsampling.py.
+
+Usage:
+    python benchmarks/bench_downsampling.py --sizes 10000 100000 1000000 --width 1200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from downsampling import downsample  # noqa: E402
+
+
+def synthetic_series(n: int, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2025-01-01", periods=n, freq="min", tz="UTC")
+    price = 40000 + np.cumsum(rng.normal(0, 25, n))
+    # A few isolated spikes that a naive stride would miss
+    spikes = rng.choice(n, size=5, replace=False)
+    price[spikes] += rng.choice([-1, 1], size=5) * 5000
+    sentiment = np.clip(rng.normal(0, 0.4, n), -1, 1)
+    sentiment[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({"timestamp": timestamps, "price_usd": price, "sentiment_score": sentiment})
+
+
+def timed(action, repeats: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = action()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def figure_bytes(frame: pd.DataFrame) -> int:
+    fig = go.Figure(go.Scatter(x=frame["timestamp"], y=frame["price_usd"], mode="lines+markers"))
+    return len(fig.to_json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--width", type=int, default=1200)
+    args = parser.parse_args()
+
+    print(f"{'points':>10} {'kept':>7} {'reduce':>9} {'figure raw':>12} {'figure reduced':>15}")
+    for n in args.sizes:
+        frame = synthetic_series(n)
+        seconds, reduced = timed(lambda: downsample(frame, "timestamp", "price_usd", args.width))
+        raw_bytes = figure_bytes(frame) if n <= 100_000 else None
+        raw_display = f"{raw_bytes:,}" if raw_bytes is not None else "skipped"
+        print(f"{n:>10,} {len(reduced):>7,} {seconds * 1000:>7.1f}ms {raw_display:>12} {figure_bytes(reduced):>15,}")
+
+
+if __name__ == "__main__":
+    main()
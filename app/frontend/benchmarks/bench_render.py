@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Time the data work of one dashboard rerun, before and after per-coin partitioning.
+
+"legacy" replays the old app.py path on one concatenated dataset: a
+boolean mask over every row, filtered/plot_data copies, separate
+timestamp sorts for the plot, the trend and the latest row, and figures
+built from every raw point. "partitioned" is the current path: the
+coin's timestamp-sorted partition (as held by the item store) sliced
+with searchsorted, downsampled series and no copies. Streamlit calls are
+left out; both sides build the same Plotly figures and KPI values.
+
+Usage:
+    python benchmarks/bench_render.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from downsampling import downsample  # noqa: E402
+
+COINS = ["bitcoin", "ethereum", "dogecoin"]
+LABELS = np.array(["positive", "neutral", "negative"])
+
+
+def synthetic_dataset(n: int, seed: int = 3) -> pd.DataFrame:
+    """n rows spread over the coins, one per minute each, in arbitrary order like a Scan."""
+    rng = np.random.default_rng(seed)
+    per_coin = -(-n // len(COINS))
+    frames = []
+    for coin in COINS:
+        frames.append(pd.DataFrame({
+            "coin": coin,
+            "coin_key": coin,
+            "coin_display": coin.title(),
+            "timestamp": pd.date_range("2024-01-01", periods=per_coin, freq="min", tz="UTC"),
+            "price_usd": 100 + np.cumsum(rng.normal(0, 1, per_coin)),
+            "price_sample_count": rng.integers(1, 60, per_coin),
+            "sentiment_score": np.clip(rng.normal(0, 0.4, per_coin), -1, 1),
+            "sentiment_label": LABELS[rng.integers(0, 3, per_coin)],
+        }))
+    dataset = pd.concat(frames, ignore_index=True).iloc[:n]
+    return dataset.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def partition(dataset: pd.DataFrame) -> dict:
+    """What the item store holds: one timestamp-sorted frame per coin."""
+    return {
+        coin: frame.sort_values("timestamp").reset_index(drop=True)
+        for coin, frame in dataset.groupby("coin_key", sort=False)
+    }
+
+
+def dual_axis_figure(price: pd.DataFrame, sentiment: pd.DataFrame) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=price["timestamp"], y=price["price_usd"], mode="lines+markers"))
+    fig.add_trace(go.Scatter(x=sentiment["timestamp"], y=sentiment["sentiment_score"],
+                             mode="lines+markers", yaxis="y2"))
+    return fig
+
+
+def legacy_rerun(dataset: pd.DataFrame, coin: str, start: pd.Timestamp, end: pd.Timestamp, width: int):
+    mask = (dataset["coin_key"] == coin) & dataset["timestamp"].between(start, end, inclusive="both")
+    filtered = dataset.loc[mask].copy()
+    plot_data = filtered.copy().sort_values("timestamp")
+    distribution = filtered.groupby("sentiment_label").size()
+    trend = filtered[["timestamp", "sentiment_score"]].dropna().sort_values("timestamp")
+    correlation = filtered[["price_usd", "sentiment_score"]].dropna().corr().iloc[0, 1]
+    latest = filtered.sort_values("timestamp").iloc[-1]
+    average = filtered["sentiment_score"].mean()
+    subset = plot_data[["timestamp", "price_usd", "sentiment_score"]].dropna(subset=["timestamp"])
+    figures = (
+        dual_axis_figure(subset[["timestamp", "price_usd"]].dropna(subset=["price_usd"]),
+                         subset[["timestamp", "sentiment_score"]].dropna(subset=["sentiment_score"])),
+        go.Figure(go.Scatter(x=trend["timestamp"], y=trend["sentiment_score"])),
+    )
+    highlights = filtered.dropna(subset=["sentiment_score"]).nlargest(5, "sentiment_score")
+    return len(filtered), latest["price_usd"], average, correlation, distribution, figures, highlights
+
+
+def partitioned_rerun(partitions: dict, coin: str, start: pd.Timestamp, end: pd.Timestamp, width: int):
+    frame = partitions[coin]
+    lo = frame["timestamp"].searchsorted(start, side="left")
+    hi = frame["timestamp"].searchsorted(end, side="right")
+    filtered = frame.iloc[lo:hi]
+    distribution = filtered.groupby("sentiment_label").size()
+    trend = downsample(filtered, "timestamp", "sentiment_score", width // 2)
+    correlation = filtered[["price_usd", "sentiment_score"]].dropna().corr().iloc[0, 1]
+    latest = filtered.iloc[-1]
+    average = filtered["sentiment_score"].mean()
+    figures = (
+        dual_axis_figure(downsample(filtered, "timestamp", "price_usd", width),
+                         downsample(filtered, "timestamp", "sentiment_score", width)),
+        go.Figure(go.Scatter(x=trend["timestamp"], y=trend["sentiment_score"])),
+    )
+    highlights = filtered.loc[filtered["sentiment_score"].nlargest(5).index]
+    return len(filtered), latest["price_usd"], average, correlation, distribution, figures, highlights
+
+
+def timed(action, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = action()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--width", type=int, default=1200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'index once':>11} {'legacy rerun':>13} {'partitioned rerun':>18} {'speedup':>8}")
+    for n in args.sizes:
+        dataset = synthetic_dataset(n)
+        index_seconds, partitions = timed(lambda: partition(dataset), 1)
+        frame = partitions["bitcoin"]
+        # Second half of the coin's history, like a narrowed date range
+        start = frame["timestamp"].iloc[len(frame) // 2]
+        end = frame["timestamp"].iloc[-1]
+
+        legacy_seconds, legacy = timed(lambda: legacy_rerun(dataset, "bitcoin", start, end, args.width), args.repeats)
+        new_seconds, new = timed(lambda: partitioned_rerun(partitions, "bitcoin", start, end, args.width), args.repeats)
+        # Same rows and KPIs either way
+        assert legacy[:2] == new[:2], (legacy[:2], new[:2])
+        assert np.isclose(legacy[2], new[2]) and np.isclose(legacy[3], new[3])
+        assert legacy[4].equals(new[4])
+        assert list(legacy[6]["sentiment_score"]) == list(new[6]["sentiment_score"])
+
+        print(f"{n:>10,} {index_seconds * 1000:>9.1f}ms {legacy_seconds * 1000:>11.1f}ms "
+              f"{new_seconds * 1000:>16.1f}ms {legacy_seconds / new_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
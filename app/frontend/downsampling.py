@@ -0,0 +1,65 @@
+"""Reduce time series to what a chart of a given pixel width can show."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# first, last, min and max of every pixel column
+POINTS_PER_PIXEL = 4
+
+
+def _first_match(y: np.ndarray, segment: np.ndarray, per_segment: np.ndarray) -> np.ndarray:
+    """Position of the first value in each segment equal to that segment's entry of `per_segment`."""
+    hits = np.flatnonzero(y == per_segment[segment])
+    _, first = np.unique(segment[hits], return_index=True)
+    return hits[first]
+
+
+def m4_indices(x: np.ndarray, y: np.ndarray, width_px: int) -> np.ndarray:
+    """
+    Positions of the points to keep so a line drawn `width_px` wide looks unchanged.
+
+    `x` must be sorted ascending and `y` free of NaN. Points are bucketed
+    into one bucket per pixel column by their x value. For each bucket the
+    first, last, minimum and maximum points are kept (M4 aggregation), so
+    every extreme of the series survives. Series that already fit the
+    budget are returned whole.
+    """
+    n = len(y)
+    if width_px <= 0:
+        raise ValueError("width_px must be a positive integer")
+    if n <= POINTS_PER_PIXEL * width_px:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    span = x[-1] - x[0]
+    if span <= 0:
+        buckets = np.zeros(n, dtype=np.int64)
+    else:
+        buckets = np.minimum(((x - x[0]) / span * width_px).astype(np.int64), width_px - 1)
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    segment = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    return np.unique(np.concatenate([
+        starts,
+        ends,
+        _first_match(y, segment, np.minimum.reduceat(y, starts)),
+        _first_match(y, segment, np.maximum.reduceat(y, starts)),
+    ]))
+
+
+def downsample(frame: pd.DataFrame, x_col: str, y_col: str, width_px: int) -> pd.DataFrame:
+    """Rows of `frame` (sorted by `x_col`) with a non-null `y_col`, reduced with m4_indices."""
+    series = frame[[x_col, y_col]].dropna(subset=[y_col])
+    if series.empty:
+        return series
+    x = series[x_col]
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x = x.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    else:
+        x = x.to_numpy(dtype=np.float64)
+    keep = m4_indices(x, series[y_col].to_numpy(dtype=np.float64), width_px)
+    if len(keep) == len(series):
+        return series
+    return series.iloc[keep]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The dashboard's modules are imported the way Streamlit runs app.py: from its own directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsampling import POINTS_PER_PIXEL, downsample, m4_indices
+
+WIDTH = 120
+
+
+def synthetic_series(n: int, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    price = 40000 + np.cumsum(rng.normal(0, 25, n))
+    # Isolated spikes that a plain stride would miss
+    spikes = rng.choice(n, size=5, replace=False)
+    price[spikes] += rng.choice([-1, 1], size=5) * 5000
+    sentiment = np.clip(rng.normal(0, 0.4, n), -1, 1)
+    sentiment[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=n, freq="min", tz="UTC"),
+        "price_usd": price,
+        "sentiment_score": sentiment,
+    })
+
+
+def pixel_columns(timestamps: pd.Series, width: int) -> np.ndarray:
+    x = timestamps.to_numpy(dtype="datetime64[ns]").view(np.int64).astype(np.float64)
+    return np.minimum(((x - x[0]) / (x[-1] - x[0]) * width).astype(np.int64), width - 1)
+
+
+@pytest.mark.parametrize("column", ["price_usd", "sentiment_score"])
+def test_downsample_keeps_every_pixel_columns_first_last_min_and_max(column):
+    frame = synthetic_series(20_000)
+    series = frame[["timestamp", column]].dropna()
+
+    reduced = downsample(frame, "timestamp", column, WIDTH)
+
+    assert len(reduced) <= POINTS_PER_PIXEL * WIDTH
+    assert reduced["timestamp"].is_monotonic_increasing
+    buckets = pd.Series(pixel_columns(series["timestamp"], WIDTH), index=series.index)
+    expected = series[column].groupby(buckets).agg(["first", "last", "min", "max"])
+    kept = reduced[column].groupby(buckets.loc[reduced.index]).agg(["first", "last", "min", "max"])
+    pd.testing.assert_frame_equal(expected, kept)
+
+
+def test_downsample_keeps_global_extremes_and_endpoints():
+    frame = synthetic_series(20_000)
+
+    reduced = downsample(frame, "timestamp", "price_usd", WIDTH)
+
+    assert reduced["price_usd"].max() == frame["price_usd"].max()
+    assert reduced["price_usd"].min() == frame["price_usd"].min()
+    assert reduced.index[0] == frame.index[0] and reduced.index[-1] == frame.index[-1]
+
+
+def test_m4_indices_keeps_first_last_min_and_max_per_bucket():
+    x = np.arange(12, dtype=np.float64)
+    y = np.array([5, 1, 9, 3, 2, 8, 0, 4, 7, 6, 6, 6], dtype=np.float64)
+
+    # Two buckets of six points with a budget of 4 points per bucket
+    keep = m4_indices(x, y, 2)
+
+    assert list(keep) == [0, 1, 2, 5, 6, 8, 11]
+
+
+def test_m4_indices_returns_series_within_budget_whole():
+    assert list(m4_indices(np.arange(10.0), np.arange(10.0), 10)) == list(range(10))
+    assert list(m4_indices(np.arange(8.0), np.arange(8.0), 2)) == list(range(8))
+
+
+def test_m4_indices_keeps_endpoints_of_constant_x():
+    keep = m4_indices(np.zeros(10_000), np.ones(10_000), 10)
+
+    assert list(keep) == [0, 9_999]
+
+
+def test_m4_indices_rejects_non_positive_width():
+    with pytest.raises(ValueError):
+        m4_indices(np.arange(10.0), np.arange(10.0), 0)
+
+
+def test_downsample_passes_short_series_through_without_nulls():
+    frame = synthetic_series(50)
+    frame.loc[3, "price_usd"] = np.nan
+
+    reduced = downsample(frame, "timestamp", "price_usd", WIDTH)
+
+    pd.testing.assert_frame_equal(reduced, frame[["timestamp", "price_usd"]].drop(index=3))
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pandas as pd
+
+from item_store import KEY_TS_FORMAT, IncrementalItemStore
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    # The parts of app._normalize_columns the store relies on
+    df["timestamp"] = pd.to_datetime(df["current_ts"], utc=True)
+    df["current_ts"] = df["timestamp"]
+    return df.sort_values("timestamp").reset_index(drop=True)
+
+
+class StubTable:
+    """Hourly items of one coin, queried newest first like the dashboard's DynamoDB Query."""
+
+    def __init__(self, hours: int):
+        self.now = pd.Timestamp.now(tz="UTC").floor(timedelta(hours=1))
+        self.items = [
+            {"coin": "bitcoin", "current_ts": (self.now - timedelta(hours=h)).strftime(KEY_TS_FORMAT), "sentiment_score": 0.0}
+            for h in range(hours)
+        ]
+        self.calls = []
+
+    def query(self, coin, start_key, end_key, limit):
+        self.calls.append((start_key, end_key, limit))
+        matching = sorted(
+            (item for item in self.items if item["coin"] == coin and start_key <= item["current_ts"] <= end_key),
+            key=lambda item: item["current_ts"],
+            reverse=True,
+        )
+        return [dict(item) for item in (matching[:limit] if limit else matching)]
+
+    def key(self, hours_ago: float) -> str:
+        return (self.now - timedelta(hours=hours_ago)).strftime(KEY_TS_FORMAT)
+
+
+def _store(table: StubTable) -> IncrementalItemStore:
+    return IncrementalItemStore(table.query, _normalize, max_age_days=30, overlap_hours=3, min_refresh_seconds=0)
+
+
+def test_window_older_than_the_capped_load_is_queried_directly():
+    table = StubTable(hours=28 * 24)
+    store = _store(table)
+    store.refresh(["bitcoin"], table.key(28 * 24), table.key(0), 100)
+
+    views = store.refresh(["bitcoin"], table.key(20 * 24), table.key(15 * 24), 100)
+
+    assert len(views["bitcoin"]) == 100
+    assert table.calls[-1] == (table.key(20 * 24), table.key(15 * 24), 100)
+
+
+def test_larger_row_cap_reloads_the_coin():
+    table = StubTable(hours=28 * 24)
+    store = _store(table)
+    small = store.refresh(["bitcoin"], table.key(28 * 24), table.key(0), 100)
+    large = store.refresh(["bitcoin"], table.key(28 * 24), table.key(0), 1000)
+
+    assert len(small["bitcoin"]) == 100
+    assert len(large["bitcoin"]) == len(table.items)
+
+
+def test_uncapped_load_is_served_from_the_store_with_only_a_delta_query():
+    table = StubTable(hours=48)
+    store = _store(table)
+    store.refresh(["bitcoin"], table.key(72), table.key(0), 1000)
+    table.calls.clear()
+
+    views = store.refresh(["bitcoin"], table.key(30), table.key(10), 1000)
+
+    assert len(views["bitcoin"]) == 21
+    # Only the overlap behind the newest held hour is re-read
+    assert table.calls == [(table.key(3), "9999-12-31T23:59:59", None)]
+
+
+def test_trimming_to_a_smaller_cap_moves_coverage_forward():
+    table = StubTable(hours=48)
+    store = _store(table)
+    store.refresh(["bitcoin"], table.key(47), table.key(0), 1000)
+    store.refresh(["bitcoin"], table.key(47), table.key(0), 10)
+    table.calls.clear()
+
+    views = store.refresh(["bitcoin"], table.key(40), table.key(30), 10)
+
+    assert len(views["bitcoin"]) == 10
+    assert table.calls[-1] == (table.key(40), table.key(30), 10)
@@ -5,4 +5,28 @@ EMR_SERVERLESS_APPLICATION_ID = os.getenv("EMR_APPLICATION_ID", "")
 SQS_QUEUE_URL = os.getenv("SQS_QUEUE_URL", "")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 EMR_EXECUTION_ROLE_ARN = os.getenv("EMR_EXECUTION_ROLE_ARN", "")
-EMR_SCRIPT_PATH = os.getenv("EMR_SCRIPT_PATH", "spark_jobs/sentiment_spark_job.py")
\ No newline at end of file
+EMR_SCRIPT_PATH = os.getenv("EMR_SCRIPT_PATH", "spark_jobs/sentiment_spark_job.py")
+# Comma separated bucket keys of helper modules shipped to the Spark job via spark.submit.pyFiles
+EMR_PY_FILES = os.getenv(
+    "EMR_PY_FILES",
+    "spark_jobs/dependencies/coin_matcher.py,spark_jobs/dependencies/schemas.py,"
+    "spark_jobs/dependencies/compaction.py",
+)
+# Spark sizing per job, picked by raw input volume: the first profile whose max_input_mb covers it
+EMR_SIZING_PROFILES = os.getenv("EMR_SIZING_PROFILES", """[
+    {"name": "small", "max_input_mb": 20, "executor_instances": 1, "executor_memory": "2G", "executor_cores": 2, "max_executors": 2},
+    {"name": "medium", "max_input_mb": 200, "executor_instances": 2, "executor_memory": "4G", "executor_cores": 2, "max_executors": 6},
+    {"name": "large", "max_input_mb": null, "executor_instances": 4, "executor_memory": "8G", "executor_cores": 4, "max_executors": 12}
+]""")
+# Adjacent hour partitions are grouped into one EMR job of at most this many hours
+EMR_MAX_PARTITIONS_PER_JOB = int(os.getenv("EMR_MAX_PARTITIONS_PER_JOB", "6"))
+# "immediate" submits a job per partition as notifications arrive, "debounced" records them in the
+# partition store and submits once the partition is quiet or its hour has closed
+SCHEDULING_MODE = os.getenv("SCHEDULING_MODE", "immediate")
+SCHEDULER_QUIET_SECONDS = int(os.getenv("SCHEDULER_QUIET_SECONDS", "600"))
+SCHEDULER_CLOSE_GRACE_SECONDS = int(os.getenv("SCHEDULER_CLOSE_GRACE_SECONDS", "300"))
+# DynamoDB table for pending partitions; when empty a local JSON file is used instead
+SCHEDULER_TABLE_NAME = os.getenv("SCHEDULER_TABLE_NAME", "")
+SCHEDULER_DYNAMODB_ENDPOINT_URL = os.getenv("SCHEDULER_DYNAMODB_ENDPOINT_URL") or None
+SCHEDULER_LOCAL_STATE_PATH = os.getenv("SCHEDULER_LOCAL_STATE_PATH", "/tmp/task_manager_partitions.json")
+SCHEDULER_STATE_TTL_DAYS = int(os.getenv("SCHEDULER_STATE_TTL_DAYS", "8"))
@@ -1,4 +1,3 @@
-import json
 import logging
 from processor.task_processor import TaskProcessor
 from config import SQS_QUEUE_URL
@@ -12,14 +11,10 @@ def handle(event, context):
         results = task_processor.process()
         
         logger.info(f"Lambda processing completed: {results}")
-        return results.get("batchItemFailures")
+        return {"batchItemFailures": results["failures"]["batchItemFailures"]}
         
     except Exception as e:
+        # With ReportBatchItemFailures a response without batchItemFailures acknowledges every
+        # message, so an unexpected error is raised to have SQS retry the whole batch
         logger.error(f"Error in lambda handler: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': 'Processing failed',
-                'error': str(e)
-            })
-        }
\ No newline at end of file
+        raise
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+from config import (
+    AWS_REGION, SCHEDULER_TABLE_NAME, SCHEDULER_DYNAMODB_ENDPOINT_URL, SCHEDULER_LOCAL_STATE_PATH,
+    SCHEDULER_STATE_TTL_DAYS,
+)
+
+# Partition lifecycle in the store:
+#   pending_count   raw objects seen since the last submission
+#   last_seen_at    when the most recent object was reported (drives the quiet period)
+#   runs            jobs submitted so far; arrivals after the first run are late files
+#   job_run_id      last submitted EMR job run
+
+
+def _iso(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def hour_end(partition: str) -> datetime:
+    return datetime.strptime(partition, "%Y/%m/%d/%H").replace(tzinfo=timezone.utc) + timedelta(hours=1)
+
+
+def is_due(item: Dict[str, Any], now: datetime, quiet_seconds: int, close_grace_seconds: int) -> bool:
+    """
+    Whether a partition should be submitted now.
+
+    A first run is due once no object arrived for `quiet_seconds` or once the
+    hour has closed. Late files (after a run) wait for the hour to close and
+    the quiet period, so they collapse into a single follow-up run.
+    """
+    if int(item.get("pending_count", 0)) <= 0:
+        return False
+    quiet = now - datetime.fromisoformat(item["last_seen_at"]) >= timedelta(seconds=quiet_seconds)
+    closed = now >= hour_end(item["partition"]) + timedelta(seconds=close_grace_seconds)
+    if int(item.get("runs", 0)) == 0:
+        return quiet or closed
+    return quiet and closed
+
+
+class DynamoPartitionStore:
+    """Pending partitions in a DynamoDB table keyed by `partition` (YYYY/MM/DD/HH)."""
+
+    def __init__(self, table_name: str = SCHEDULER_TABLE_NAME, endpoint_url: Optional[str] = SCHEDULER_DYNAMODB_ENDPOINT_URL):
+        self.table = boto3.resource("dynamodb", region_name=AWS_REGION, endpoint_url=endpoint_url).Table(table_name)
+
+    def record_arrivals(self, partition: str, count: int, now: datetime) -> None:
+        expires_at = int((hour_end(partition) + timedelta(days=SCHEDULER_STATE_TTL_DAYS)).timestamp())
+        try:
+            self.table.update_item(
+                Key={"partition": partition},
+                UpdateExpression=(
+                    "ADD pending_count :n SET last_seen_at = :now, "
+                    "first_seen_at = if_not_exists(first_seen_at, :now), expires_at = :ttl"
+                ),
+                ExpressionAttributeValues={":n": count, ":now": _iso(now), ":ttl": expires_at},
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"Failed to record arrivals for partition {partition}: {e}")
+
+    def pending(self) -> List[Dict[str, Any]]:
+        items, kwargs = [], {
+            "FilterExpression": "pending_count > :zero",
+            "ExpressionAttributeValues": {":zero": 0},
+        }
+        while True:
+            page = self.table.scan(**kwargs)
+            items.extend(page.get("Items", []))
+            if "LastEvaluatedKey" not in page:
+                return items
+            kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+    def claim(self, item: Dict[str, Any], now: datetime) -> bool:
+        """
+        Take the partition's pending objects for one submission.
+
+        Conditional on `pending_count` being unchanged, so two concurrent
+        invocations cannot both submit it and objects reported meanwhile stay
+        pending for the next run.
+        """
+        try:
+            self.table.update_item(
+                Key={"partition": item["partition"]},
+                UpdateExpression="SET pending_count = :zero, claimed_at = :now ADD processed_count :n, runs :one",
+                ConditionExpression="pending_count = :n",
+                ExpressionAttributeValues={":zero": 0, ":n": item["pending_count"], ":one": 1, ":now": _iso(now)},
+            )
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def release(self, item: Dict[str, Any]) -> None:
+        """Undo a claim whose submission failed."""
+        self.table.update_item(
+            Key={"partition": item["partition"]},
+            UpdateExpression="ADD pending_count :n, processed_count :minus_n, runs :minus_one",
+            ExpressionAttributeValues={":n": item["pending_count"], ":minus_n": -item["pending_count"], ":minus_one": -1},
+        )
+
+    def mark_submitted(self, partition: str, job_run_id: str, now: datetime) -> None:
+        self.table.update_item(
+            Key={"partition": partition},
+            UpdateExpression="SET job_run_id = :job, submitted_at = :now",
+            ExpressionAttributeValues={":job": job_run_id, ":now": _iso(now)},
+        )
+
+
+class LocalPartitionStore:
+    """
+    JSON-file stand-in for DynamoPartitionStore, for running the task manager locally.
+
+    Not safe across processes; a lock only covers threads of one process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def _save(self, items: Dict[str, Dict[str, Any]]) -> None:
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump(items, fh, indent=2, sort_keys=True)
+
+    def record_arrivals(self, partition: str, count: int, now: datetime) -> None:
+        with self._lock:
+            items = self._load()
+            item = items.setdefault(partition, {"partition": partition, "first_seen_at": _iso(now)})
+            item["pending_count"] = item.get("pending_count", 0) + count
+            item["last_seen_at"] = _iso(now)
+            self._save(items)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [item for item in self._load().values() if item.get("pending_count", 0) > 0]
+
+    def claim(self, item: Dict[str, Any], now: datetime) -> bool:
+        with self._lock:
+            items = self._load()
+            stored = items.get(item["partition"], {})
+            if stored.get("pending_count") != item["pending_count"]:
+                return False
+            stored["processed_count"] = stored.get("processed_count", 0) + stored["pending_count"]
+            stored["pending_count"] = 0
+            stored["runs"] = stored.get("runs", 0) + 1
+            stored["claimed_at"] = _iso(now)
+            self._save(items)
+            return True
+
+    def release(self, item: Dict[str, Any]) -> None:
+        with self._lock:
+            items = self._load()
+            stored = items[item["partition"]]
+            stored["pending_count"] += item["pending_count"]
+            stored["processed_count"] -= item["pending_count"]
+            stored["runs"] -= 1
+            self._save(items)
+
+    def mark_submitted(self, partition: str, job_run_id: str, now: datetime) -> None:
+        with self._lock:
+            items = self._load()
+            items[partition].update({"job_run_id": job_run_id, "submitted_at": _iso(now)})
+            self._save(items)
+
+
+def get_partition_store():
+    """DynamoDB store when SCHEDULER_TABLE_NAME is set, otherwise the local JSON file stand-in."""
+    if SCHEDULER_TABLE_NAME:
+        return DynamoPartitionStore()
+    return LocalPartitionStore(SCHEDULER_LOCAL_STATE_PATH)
@@ -0,0 +1,84 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from config import DATA_BUCKET_NAME, EMR_SIZING_PROFILES
+
+logger = logging.getLogger(__name__)
+
+RAW_REDDIT_PREFIX = "raw/reddit/cryptocurrency"
+# Written by the Spark job in incremental mode; "processed" lists the raw object keys it has read
+PROCESSED_MANIFEST_PREFIX = "processed/manifests/reddit"
+MANIFEST_NAME = "_manifest.json"
+
+
+def load_profiles(raw: str = EMR_SIZING_PROFILES) -> List[Dict[str, Any]]:
+    """
+    Parse the sizing table, ordered by `max_input_mb`.
+
+    Each profile has a name, an upper input bound in MB (null for the last,
+    catch-all profile), executor_instances, executor_memory, executor_cores
+    and max_executors.
+    """
+    profiles = json.loads(raw)
+    if not profiles:
+        raise ValueError("EMR_SIZING_PROFILES must define at least one profile")
+    return sorted(profiles, key=lambda p: float("inf") if p.get("max_input_mb") is None else p["max_input_mb"])
+
+
+def choose_profile(input_bytes: int, profiles: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Smallest profile whose max_input_mb covers the input; the largest one otherwise."""
+    profiles = profiles or load_profiles()
+    input_mb = input_bytes / (1024 * 1024)
+    for profile in profiles:
+        if profile.get("max_input_mb") is None or input_mb <= profile["max_input_mb"]:
+            return profile
+    return profiles[-1]
+
+
+def spark_properties(profile: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        'spark.executor.instances': str(profile["executor_instances"]),
+        'spark.executor.memory': profile["executor_memory"],
+        'spark.executor.cores': str(profile["executor_cores"]),
+        'spark.dynamicAllocation.initialExecutors': str(profile["executor_instances"]),
+        'spark.dynamicAllocation.maxExecutors': str(profile["max_executors"]),
+    }
+
+
+def load_processed_keys(s3_client, partition: str) -> Set[str]:
+    """Bucket keys of the partition's raw objects that the Spark job already processed."""
+    try:
+        body = s3_client.get_object(
+            Bucket=DATA_BUCKET_NAME, Key=f"{PROCESSED_MANIFEST_PREFIX}/{partition}/{MANIFEST_NAME}"
+        )["Body"].read()
+    except ClientError as ex:
+        if ex.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+            return set()
+        raise
+    # The job records keys as URL paths ("/raw/..."), S3 listings without the leading slash
+    return {key.lstrip('/') for key in json.loads(body)["processed"]}
+
+
+def estimate_input_bytes(s3_client, partitions: List[str], notified_bytes: int = 0) -> int:
+    """
+    Total size of the raw Reddit objects in `partitions` the Spark job has yet to process.
+
+    The job only reads objects missing from each partition's processed
+    manifest, so those are listed and summed; a follow-up run for a few late
+    objects is sized for them, not for the whole hour. The sizes in the
+    notifications are the fallback when S3 cannot be read.
+    """
+    total = 0
+    try:
+        paginator = s3_client.get_paginator('list_objects_v2')
+        for partition in partitions:
+            processed = load_processed_keys(s3_client, partition)
+            for page in paginator.paginate(Bucket=DATA_BUCKET_NAME, Prefix=f"{RAW_REDDIT_PREFIX}/{partition}/"):
+                total += sum(obj['Size'] for obj in page.get('Contents', []) if obj['Key'] not in processed)
+    except (BotoCoreError, ClientError, ValueError, KeyError) as ex:
+        logger.warning(f"Could not size partitions {partitions} from S3, sizing from notifications: {ex}")
+        return notified_bytes
+    return max(total, notified_bytes)
@@ -1,15 +1,57 @@
 import boto3
 import json
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-from config import AWS_REGION, DATA_BUCKET_NAME, EMR_SCRIPT_PATH, EMR_SERVERLESS_APPLICATION_ID, EMR_EXECUTION_ROLE_ARN
+from typing import List, Dict, Any, Optional, Set
+from datetime import datetime, timedelta, timezone
+from config import (
+    AWS_REGION, DATA_BUCKET_NAME, EMR_SCRIPT_PATH, EMR_SERVERLESS_APPLICATION_ID, EMR_EXECUTION_ROLE_ARN, EMR_PY_FILES,
+    SCHEDULING_MODE, SCHEDULER_QUIET_SECONDS, SCHEDULER_CLOSE_GRACE_SECONDS, EMR_MAX_PARTITIONS_PER_JOB,
+)
+from processor.partition_store import get_partition_store, is_due
+from processor.sizing import choose_profile, estimate_input_bytes, spark_properties
 logger = logging.getLogger(__name__)
+ACTIVE_JOB_STATES = ['SUBMITTED', 'PENDING', 'SCHEDULED', 'RUNNING', 'QUEUED']
+PARTITION_FORMAT = "%Y/%m/%d/%H"
+# Multi-hour jobs are named "<first partition>..<last partition>"
+BATCH_NAME_SEPARATOR = ".."
+
+
+def group_adjacent(partitions: List[str], max_size: int = EMR_MAX_PARTITIONS_PER_JOB) -> List[List[str]]:
+    """Split partitions into runs of consecutive hours, at most `max_size` per run."""
+    groups: List[List[str]] = []
+    previous = None
+    for partition in sorted(set(partitions)):
+        current = datetime.strptime(partition, PARTITION_FORMAT)
+        if groups and len(groups[-1]) < max_size and current - previous == timedelta(hours=1):
+            groups[-1].append(partition)
+        else:
+            groups.append([partition])
+        previous = current
+    return groups
+
+
+def batch_job_name(partitions: List[str]) -> str:
+    if len(partitions) == 1:
+        return partitions[0]
+    return f"{partitions[0]}{BATCH_NAME_SEPARATOR}{partitions[-1]}"
+
+
+def job_partitions(name: str) -> List[str]:
+    """Partitions covered by a job name from batch_job_name."""
+    if BATCH_NAME_SEPARATOR not in name:
+        return [name]
+    first, last = (datetime.strptime(part, PARTITION_FORMAT) for part in name.split(BATCH_NAME_SEPARATOR, 1))
+    hours = int((last - first).total_seconds() // 3600)
+    return [(first + timedelta(hours=i)).strftime(PARTITION_FORMAT) for i in range(hours + 1)]
+
 
 class TaskProcessor:
-    def __init__(self, event: Optional[Dict[str, Any]] = None):
+    def __init__(self, event: Optional[Dict[str, Any]] = None, partition_store=None):
         self.emr_serverless = boto3.client('emr-serverless', region_name=AWS_REGION)
+        self.s3 = boto3.client('s3', region_name=AWS_REGION)
         self.event = event or {}
+        self.partition_store = partition_store
+        self._running_partitions: Optional[Set[str]] = None
 
     def __format_datetime_path(self, dt):
         return f"{dt.year:04d}/{dt.month:02d}/{dt.day:02d}/{dt.hour:02d}"
@@ -26,6 +68,7 @@ class TaskProcessor:
                     messages.append({
                         'bucket_name': bucket_name,
                         'object_key': object_key,
+                        'size': s3_info.get('object', {}).get('size', 0),
                         'messageId':  message.get("messageId")
                     })
         
@@ -42,7 +85,43 @@ class TaskProcessor:
                 message_partitions[partition_datetime].append(notification)
         return message_partitions
 
+    def running_partitions(self) -> Set[str]:
+        """
+        Partitions covered by the application's active job runs.
+
+        Listed once per invocation, following nextToken through every page,
+        and kept up to date locally by submit_emr_job.
+        """
+        if self._running_partitions is None:
+            running, kwargs = set(), {
+                'applicationId': EMR_SERVERLESS_APPLICATION_ID,
+                'states': ACTIVE_JOB_STATES,
+                'mode': "BATCH",
+                'maxResults': 50,
+            }
+            while True:
+                page = self.emr_serverless.list_job_runs(**kwargs)
+                for job in page.get('jobRuns', []):
+                    running.update(job_partitions(job['name']))
+                if not page.get('nextToken'):
+                    break
+                kwargs['nextToken'] = page['nextToken']
+            self._running_partitions = running
+        return self._running_partitions
+
+    def __is_running(self, formatted_partition: str) -> bool:
+        return formatted_partition in self.running_partitions()
+
+    def __failed(self, response, partition, notifications):
+        response['failures']['batchItemFailures'].extend(
+            {"itemIdentifier": message_id}
+            for message_id in dict.fromkeys(n.get("messageId") for n in notifications)
+        )
+        response['failures']["partitions"].append(partition)
+
     def process(self):
+        if SCHEDULING_MODE == "debounced":
+            return self.process_debounced()
         s3_notifications = self.__parse_event()
         message_partitions = self.__group_messages_by_datetime(s3_notifications)
         response = {
@@ -53,39 +132,125 @@ class TaskProcessor:
                 "partitions": []
             }
         }
+        to_submit = {}
         for partition, notifications in message_partitions.items():
             try:
                 print(partition)
                 formatted_partition = self.__format_datetime_path(partition)
-                running_jobs = self.emr_serverless.list_job_runs(
-                    applicationId=EMR_SERVERLESS_APPLICATION_ID,
-                    states=['SUBMITTED', 'PENDING', 'SCHEDULED', 'RUNNING', 'QUEUED'],
-                    mode="BATCH",
-                    maxResults=50
-                )
-                if formatted_partition in [job['name'] for job in running_jobs.get('jobRuns', [])]:
+                if self.__is_running(formatted_partition):
                     logger.info(f"EMR job for partition {partition} is already running. Skipping submission.")
                     response["completed"] +=1
                     continue
-                self.submit_emr_job(partition=formatted_partition, 
-                                    script_path=EMR_SCRIPT_PATH)
-                response["completed"] +=1
+                to_submit[formatted_partition] = (partition, notifications)
             except Exception as ex:
                 logger.error(str(ex))
                 logger.error(f"Failed to submit EMR job for partition {partition}")
-                response['failures']['batchItemFailures'].append({"itemIdentifiers": notifications[0].get("messageId")})
-                response['failures']["partitions"].append(partition)
+                self.__failed(response, partition, notifications)
+
+        # Adjacent hours share one job, so startup and model load are paid once per group
+        for group in group_adjacent(list(to_submit)):
+            try:
+                notified_bytes = sum(n['size'] for p in group for n in to_submit[p][1])
+                self.submit_emr_job(partition=group[0], script_path=EMR_SCRIPT_PATH, partitions=group,
+                                    notified_bytes=notified_bytes)
+                response["completed"] += len(group)
+            except Exception as ex:
+                logger.error(str(ex))
+                for formatted_partition in group:
+                    partition, notifications = to_submit[formatted_partition]
+                    logger.error(f"Failed to submit EMR job for partition {partition}")
+                    self.__failed(response, partition, notifications)
+        return response
+
+    def process_debounced(self, now: Optional[datetime] = None):
+        """
+        Record this batch's partitions in the partition store, then submit every due partition.
+
+        Messages are acknowledged once their partition is recorded, so SQS only
+        retries those whose store update failed. Scheduled invocations carry no
+        records and only submit due partitions.
+        """
+        now = now or datetime.now(timezone.utc)
+        store = self.partition_store or get_partition_store()
+        message_partitions = self.__group_messages_by_datetime(self.__parse_event())
+        response = {
+            "total": len(message_partitions),
+            "recorded": 0,
+            "submitted": [],
+            "failures": {
+                "batchItemFailures": [],
+                "partitions": []
+            }
+        }
+        for partition, notifications in message_partitions.items():
+            try:
+                store.record_arrivals(self.__format_datetime_path(partition), len(notifications), now)
+                response["recorded"] += 1
+            except Exception as ex:
+                logger.error(str(ex))
+                self.__failed(response, partition, notifications)
+
+        claimed = {}
+        for item in store.pending():
+            partition = item["partition"]
+            if not is_due(item, now, SCHEDULER_QUIET_SECONDS, SCHEDULER_CLOSE_GRACE_SECONDS):
+                continue
+            try:
+                # A running job keeps the partition pending; it becomes a follow-up run later
+                if not self.__is_running(partition) and store.claim(item, now):
+                    claimed[partition] = item
+            except Exception as ex:
+                logger.error(f"Failed to claim partition {partition}: {ex}")
+
+        for group in group_adjacent(list(claimed)):
+            try:
+                job_run_id = self.submit_emr_job(partition=group[0], script_path=EMR_SCRIPT_PATH, partitions=group)
+            except Exception as ex:
+                # Released back to pending, so the next invocation retries them
+                logger.error(f"Failed to submit EMR job for partitions {group}: {ex}")
+                for partition in group:
+                    store.release(claimed[partition])
+                continue
+            for partition in group:
+                item = claimed[partition]
+                try:
+                    store.mark_submitted(partition, job_run_id, now)
+                except Exception as ex:
+                    # The job is running and the claim already cleared the pending count, so only the
+                    # job id is lost; failing the batch would re-record its arrivals and rerun the hour
+                    logger.error(f"Failed to record job {job_run_id} for partition {partition}: {ex}")
+                kind = "follow-up" if int(item.get("runs", 0)) else "initial"
+                logger.info(f"Submitted {kind} run for partition {partition} covering {item['pending_count']} objects")
+                response["submitted"].append(partition)
         return response
     
-    def submit_emr_job(self, partition: str, script_path: str, entry_point_args=[]) -> str:
+    def submit_emr_job(self, partition: str, script_path: str, entry_point_args=[],
+                       partitions: Optional[List[str]] = None, notified_bytes: int = 0) -> str:
+        """
+        Start one job run for `partition`, or for every hour in `partitions`.
+
+        Several partitions are passed to the job as a comma separated list of
+        raw input paths and processed in a single Spark session. Executors are
+        sized from the partitions' raw volume using the EMR_SIZING_PROFILES table.
+        """
+        partitions = partitions or [partition]
+        input_paths = ",".join(f"s3://{DATA_BUCKET_NAME}/raw/reddit/cryptocurrency/{p}" for p in partitions)
+        name = batch_job_name(partitions)
+        input_bytes = estimate_input_bytes(self.s3, partitions, notified_bytes)
+        profile = choose_profile(input_bytes)
+        logger.info(
+            f"Sizing job {name} with profile {profile['name']} for {input_bytes} input bytes "
+            f"across {len(partitions)} partition(s): {json.dumps(profile)}"
+        )
         response = self.emr_serverless.start_job_run(
-            name=partition,
+            name=name,
+            tags={'sizing_profile': profile['name'], 'input_bytes': str(input_bytes)},
             applicationId=EMR_SERVERLESS_APPLICATION_ID,
             executionRoleArn=EMR_EXECUTION_ROLE_ARN,
             jobDriver={
                 'sparkSubmit': {
                         'entryPoint': f's3://{DATA_BUCKET_NAME}/{script_path}',
-                        'entryPointArguments': entry_point_args + [f"s3://{DATA_BUCKET_NAME}/raw/reddit/cryptocurrency/{partition}"] + [f"s3://{DATA_BUCKET_NAME}/processed/reddit/{partition}"]
+                        'entryPointArguments': entry_point_args + [input_paths] + [f"s3://{DATA_BUCKET_NAME}/processed/reddit/{partition}"]
                 }
             },
             configurationOverrides={
@@ -93,22 +258,24 @@ class TaskProcessor:
                     {
                         'classification': 'spark-defaults',
                         'properties': {
-                            'spark.executor.instances': '1',
-                            'spark.executor.memory': '2G',
-                            'spark.executor.cores': '2',
-                            'spark.dynamicAllocation.maxExecutors': '3',
-                            'spark.dynamicAllocation.initialExecutors': '1',
-                            'spark.executorEnv.PYSPARK_PYTHON': './environment/bin/pythonspark.dynamicAllocation.maxExecutors=3',
+                            **spark_properties(profile),
+                            'spark.executorEnv.PYSPARK_PYTHON': './environment/bin/python',
                             'spark.emr-serverless.driverEnv.PYSPARK_PYTHON': './environment/bin/python',
                             'spark.emr-serverless.driverEnv.PYSPARK_DRIVER_PYTHON': './environment/bin/python',
-                            'spark.executor.instances': '2',
-                            'spark.archives': f's3://{DATA_BUCKET_NAME}/spark_jobs/dependencies/spark_venv.tar.gz#environment'
+                            'spark.archives': f's3://{DATA_BUCKET_NAME}/spark_jobs/dependencies/spark_venv.tar.gz#environment',
+                            'spark.submit.pyFiles': ",".join(
+                                f's3://{DATA_BUCKET_NAME}/{key.strip()}' for key in EMR_PY_FILES.split(",") if key.strip()
+                            ),
     
                         }
                     }
                 ]
             }
         )
-        logger.info(f"Submitted EMR job for partition {partition}: {response['jobRunId']}")
+        self.running_partitions().update(partitions)
+        logger.info(
+            f"Submitted EMR job {name} for {len(partitions)} partition(s) "
+            f"with profile {profile['name']}: {response['jobRunId']}"
+        )
         return response['jobRunId']
             
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The Lambda package is imported from its own root, where config and processor live
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
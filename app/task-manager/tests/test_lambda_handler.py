@@ -0,0 +1,28 @@
+import pytest
+
+import lambda_handler
+
+
+class FailingProcessor:
+    def __init__(self, event):
+        pass
+
+    def process(self):
+        raise RuntimeError("EMR Serverless unavailable")
+
+
+def test_unexpected_error_fails_the_whole_batch(monkeypatch):
+    monkeypatch.setattr(lambda_handler, "TaskProcessor", FailingProcessor)
+
+    with pytest.raises(RuntimeError):
+        lambda_handler.handle({'Records': [{'messageId': "m0", 'body': "{}"}]}, None)
+
+
+def test_partial_failures_are_reported_per_message(monkeypatch):
+    class PartialProcessor(FailingProcessor):
+        def process(self):
+            return {"failures": {"batchItemFailures": [{"itemIdentifier": "m0"}], "partitions": []}}
+
+    monkeypatch.setattr(lambda_handler, "TaskProcessor", PartialProcessor)
+
+    assert lambda_handler.handle({}, None) == {"batchItemFailures": [{"itemIdentifier": "m0"}]}
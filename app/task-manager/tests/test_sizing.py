@@ -0,0 +1,53 @@
+import io
+import json
+
+from botocore.exceptions import ClientError
+
+from processor.sizing import estimate_input_bytes
+
+PARTITION = "2025/01/01/00"
+RAW = f"raw/reddit/cryptocurrency/{PARTITION}"
+MANIFEST_KEY = f"processed/manifests/reddit/{PARTITION}/_manifest.json"
+
+
+class StubS3:
+    def __init__(self, objects, manifests=None):
+        self.objects = objects
+        self.manifests = manifests or {}
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        contents = [{'Key': key, 'Size': size} for key, size in self.objects.items() if key.startswith(Prefix)]
+        # Two pages, like a listing past MaxKeys
+        return [{'Contents': contents[:1]}, {'Contents': contents[1:]}]
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.manifests:
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        return {'Body': io.BytesIO(json.dumps(self.manifests[Key]).encode())}
+
+
+OBJECTS = {f"{RAW}/a.json": 1000, f"{RAW}/b.json": 200, f"{RAW}/c.json": 30}
+
+
+def test_unprocessed_partition_is_sized_from_every_object():
+    assert estimate_input_bytes(StubS3(OBJECTS), [PARTITION]) == 1230
+
+
+def test_objects_in_the_processed_manifest_are_not_counted():
+    manifest = {"partition": PARTITION, "processed": [f"/{RAW}/a.json", f"/{RAW}/b.json"]}
+
+    assert estimate_input_bytes(StubS3(OBJECTS, {MANIFEST_KEY: manifest}), [PARTITION]) == 30
+
+
+def test_notified_bytes_are_the_floor_and_the_fallback():
+    manifest = {"partition": PARTITION, "processed": [f"/{RAW}/{name}" for name in ("a.json", "b.json", "c.json")]}
+    assert estimate_input_bytes(StubS3(OBJECTS, {MANIFEST_KEY: manifest}), [PARTITION], notified_bytes=50) == 50
+
+    class Unreadable(StubS3):
+        def get_object(self, Bucket, Key):
+            raise ClientError({'Error': {'Code': 'AccessDenied'}}, 'GetObject')
+
+    assert estimate_input_bytes(Unreadable(OBJECTS), [PARTITION], notified_bytes=70) == 70
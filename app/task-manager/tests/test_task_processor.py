@@ -0,0 +1,142 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import processor.task_processor as task_processor
+from processor.task_processor import TaskProcessor
+
+
+class StubEmrServerless:
+    """list_job_runs served from fixed pages linked by nextToken."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.list_calls = []
+        self.submitted = []
+
+    def list_job_runs(self, **kwargs):
+        self.list_calls.append(kwargs)
+        index = int(kwargs.get('nextToken', 0))
+        page = {'jobRuns': [{'name': name} for name in self.pages[index]]}
+        if index + 1 < len(self.pages):
+            page['nextToken'] = str(index + 1)
+        return page
+
+    def start_job_run(self, **kwargs):
+        self.submitted.append(kwargs['name'])
+        return {'jobRunId': f"run-{len(self.submitted)}"}
+
+
+def sqs_event(partitions):
+    records = []
+    for i, partition in enumerate(partitions):
+        body = {'Records': [{'s3': {
+            'bucket': {'name': 'bucket'},
+            'object': {'key': f"raw/reddit/cryptocurrency/{partition}/posts.json", 'size': 100},
+        }}]}
+        records.append({'messageId': f"m{i}", 'body': json.dumps(body)})
+    return {'Records': records}
+
+
+def every_other_hour(count, start="2025/01/01/00"):
+    first = datetime.strptime(start, "%Y/%m/%d/%H")
+    return [(first + timedelta(hours=2 * i)).strftime("%Y/%m/%d/%H") for i in range(count)]
+
+
+@pytest.fixture
+def make_processor(monkeypatch):
+    monkeypatch.setattr(task_processor, "SCHEDULING_MODE", "immediate")
+    monkeypatch.setattr(task_processor, "estimate_input_bytes", lambda s3, partitions, notified=0: notified)
+
+    def make(pages, partitions):
+        emr = StubEmrServerless(pages)
+        monkeypatch.setattr(task_processor.boto3, "client", lambda service, **kwargs: emr if service == 'emr-serverless' else None)
+        return TaskProcessor(sqs_event(partitions)), emr
+    return make
+
+
+PAGES = [
+    ["2024/12/01/00", "2024/12/01/01"],
+    ["2025/01/01/02", "2024/12/02/00..2024/12/02/03"],
+    ["2024/12/03/00"],
+]
+
+
+@pytest.mark.parametrize("batch_size", [1, 5, 20])
+def test_job_runs_are_listed_once_per_invocation(make_processor, batch_size):
+    processor, emr = make_processor(PAGES, every_other_hour(batch_size, start="2025/02/01/00"))
+
+    response = processor.process()
+
+    assert response["completed"] == batch_size
+    assert len(emr.submitted) == batch_size
+    # One pass over the three pages, however many partitions were checked
+    assert [call.get('nextToken') for call in emr.list_calls] == [None, "1", "2"]
+
+
+def test_partition_running_on_a_later_page_is_skipped(make_processor):
+    processor, emr = make_processor(PAGES, ["2025/01/01/00", "2025/01/01/02", "2024/12/02/02"])
+
+    response = processor.process()
+
+    assert emr.submitted == ["2025/01/01/00"]
+    assert response["completed"] == 3
+    assert response["failures"]["batchItemFailures"] == []
+
+
+def test_submitted_partitions_are_added_to_the_cached_set(make_processor):
+    processor, emr = make_processor(PAGES, ["2025/01/01/00", "2025/01/01/01"])
+
+    processor.process()
+
+    assert emr.submitted == ["2025/01/01/00..2025/01/01/01"]
+    assert {"2025/01/01/00", "2025/01/01/01"} <= processor.running_partitions()
+    # The same hours arriving again in this invocation are not submitted twice or re-listed
+    processor.process()
+    assert len(emr.submitted) == 1
+    assert len(emr.list_calls) == len(PAGES)
+
+
+class StubPartitionStore:
+    """Two adjacent hours, long quiet and due, whose job id cannot be recorded for the first one."""
+
+    def __init__(self, partitions, failing_mark):
+        self.items = {p: {"partition": p, "pending_count": 3, "runs": 0, "last_seen_at": "2025-01-01T00:00:00+00:00"}
+                      for p in partitions}
+        self.failing_mark = failing_mark
+        self.marked = []
+        self.recorded = []
+
+    def record_arrivals(self, partition, count, now):
+        self.recorded.append((partition, count))
+
+    def pending(self):
+        return list(self.items.values())
+
+    def claim(self, item, now):
+        item["pending_count"] = 0
+        return True
+
+    def release(self, item):
+        raise AssertionError("a submitted partition must not be released")
+
+    def mark_submitted(self, partition, job_run_id, now):
+        if partition == self.failing_mark:
+            raise RuntimeError("ProvisionedThroughputExceededException")
+        self.marked.append((partition, job_run_id))
+
+
+def test_failed_job_id_record_does_not_fail_the_batch(make_processor, monkeypatch):
+    monkeypatch.setattr(task_processor, "SCHEDULING_MODE", "debounced")
+    store = StubPartitionStore(["2025/01/01/00", "2025/01/01/01"], failing_mark="2025/01/01/00")
+    processor, emr = make_processor([[]], [])
+    processor.partition_store = store
+
+    response = processor.process()
+
+    assert emr.submitted == ["2025/01/01/00..2025/01/01/01"]
+    # The rest of the group is still recorded and every submitted partition reported
+    assert store.marked == [("2025/01/01/01", "run-1")]
+    assert response["submitted"] == ["2025/01/01/00", "2025/01/01/01"]
+    assert response["failures"]["batchItemFailures"] == []
@@ -16,4 +16,44 @@ resource "aws_dynamodb_table" "crypto_sentiment" {
   }
 
   tags = local.common_tags
-}
\ No newline at end of file
+}
+
+# Hourly and daily rollups per coin written by the Spark job, read by the dashboard.
+# series is "<coin>#hour" or "<coin>#day", bucket_ts the bucket start (UTC)
+resource "aws_dynamodb_table" "crypto_sentiment_rollups" {
+  name         = "${local.name_prefix}-crypto-sentiment-rollups"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "series"
+  range_key    = "bucket_ts"
+
+  attribute {
+    name = "series"
+    type = "S"
+  }
+
+  attribute {
+    name = "bucket_ts"
+    type = "S"
+  }
+
+  tags = local.common_tags
+}
+
+# Pending raw partitions for the task manager's debounced scheduling
+resource "aws_dynamodb_table" "task_manager_partitions" {
+  name         = "${local.name_prefix}-task-manager-partitions"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "partition"
+
+  attribute {
+    name = "partition"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = local.common_tags
+}
@@ -10,4 +10,17 @@ resource "aws_cloudwatch_event_target" "data_extraction_target" {
   rule      = aws_cloudwatch_event_rule.data_extraction_schedule.name
   target_id = aws_lambda_function.data_extractor.function_name
   arn       = aws_lambda_function.data_extractor.arn
-}
\ No newline at end of file
+}
+# Lets the task manager submit debounced partitions even when no new notification arrives
+resource "aws_cloudwatch_event_rule" "task_manager_schedule" {
+  name                = "${local.name_prefix}-task-manager-schedule"
+  description         = "Trigger the task manager to submit quiet or closed partitions"
+  schedule_expression = var.task_manager_schedule
+  tags                = local.common_tags
+}
+
+resource "aws_cloudwatch_event_target" "task_manager_target" {
+  rule      = aws_cloudwatch_event_rule.task_manager_schedule.name
+  target_id = aws_lambda_function.task_manager.function_name
+  arn       = aws_lambda_function.task_manager.arn
+}
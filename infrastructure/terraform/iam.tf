@@ -32,7 +32,11 @@ resource "aws_iam_policy" "data_extractor_s3_policy" {
           "s3:ListBucket",
           "s3:GetObject"
         ]
-        Resource = "${aws_s3_bucket.data_bucket.arn}/*"
+        # Bucket ARN for ListBucket, so a missing checkpoint object reads as NoSuchKey
+        Resource = [
+          "${aws_s3_bucket.data_bucket.arn}",
+          "${aws_s3_bucket.data_bucket.arn}/*"
+        ]
       }
     ]
   })
@@ -72,7 +76,8 @@ resource "aws_iam_policy" "task_manager_emr_policy" {
           "emr-serverless:ListJobRuns",
           "emr-serverless:CancelJobRun",
           "emr-serverless:GetApplication",
-          "emr-serverless:ListApplications"
+          "emr-serverless:ListApplications",
+          "emr-serverless:TagResource"
         ]
         Resource = "*"
       },
@@ -133,6 +138,25 @@ resource "aws_iam_policy" "task_manager_s3_policy" {
   })
 }
 
+resource "aws_iam_policy" "task_manager_dynamodb_policy" {
+  name        = "${local.name_prefix}-task-manager-dynamodb-policy"
+  description = "Policy for task manager Lambda to track pending partitions"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:UpdateItem",
+          "dynamodb:Scan"
+        ]
+        Resource = aws_dynamodb_table.task_manager_partitions.arn
+      }
+    ]
+  })
+}
+
 resource "aws_iam_role_policy_attachment" "data_extractor_basic_execution" {
   role       = aws_iam_role.data_extractor_lambda_role.name
   policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
@@ -161,4 +185,9 @@ resource "aws_iam_role_policy_attachment" "task_manager_s3_attachment" {
 resource "aws_iam_role_policy_attachment" "task_manager_sqs_attachment" {
   role       = aws_iam_role.task_manager_lambda_role.name
   policy_arn = aws_iam_policy.task_manager_sqs_policy.arn
-}
\ No newline at end of file
+}
+
+resource "aws_iam_role_policy_attachment" "task_manager_dynamodb_attachment" {
+  role       = aws_iam_role.task_manager_lambda_role.name
+  policy_arn = aws_iam_policy.task_manager_dynamodb_policy.arn
+}
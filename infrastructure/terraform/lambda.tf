@@ -122,9 +122,19 @@ resource "aws_lambda_function" "task_manager" {
       EMR_EXECUTION_ROLE_ARN = aws_iam_role.emr_serverless_execution_role.arn
       SQS_QUEUE_URL = aws_sqs_queue.s3_notifications_queue.url
       EMR_SCRIPT_PATH = "spark_jobs/sentiment_and_join-3.py"
+      SCHEDULING_MODE = "debounced"
+      SCHEDULER_TABLE_NAME = aws_dynamodb_table.task_manager_partitions.name
     }
   }
 
   tags = local.common_tags
 }
 
+resource "aws_lambda_permission" "allow_eventbridge_invoke_task_manager" {
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.task_manager.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.task_manager_schedule.arn
+}
+
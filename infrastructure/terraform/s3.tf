@@ -33,6 +33,17 @@ resource "aws_s3_bucket_lifecycle_configuration" "data_bucket_lifecycle" {
       days = 7
     }
   }
+
+  rule {
+    id     = "expire_compacted_objects"
+    status = "Enabled"
+    filter {
+      prefix = "compacted/"
+    }
+    expiration {
+      days = 7
+    }
+  }
 }
 
 resource "aws_s3_bucket_public_access_block" "data_bucket_pab" {
@@ -89,6 +100,22 @@ resource "aws_s3_object" "spark_dependencies_zip" {
   }
 }
 
+# Upload helper modules imported by the Spark jobs (passed via spark.submit.pyFiles)
+resource "aws_s3_object" "spark_job_modules" {
+  for_each = {
+    "coin_matcher.py" = "${path.module}/../../app/data-extractor/utils/coin_matcher.py"
+    "schemas.py"      = "${path.module}/spark_jobs/schemas.py"
+    "compaction.py"   = "${path.module}/spark_jobs/compaction.py"
+  }
+
+  bucket = aws_s3_bucket.data_bucket.bucket
+  key    = "spark_jobs/dependencies/${each.key}"
+  source = each.value
+  etag   = filemd5(each.value)
+
+  tags = local.common_tags
+}
+
 # S3 Bucket for EMR Serverless Logs
 resource "aws_s3_bucket" "emr_logs_bucket" {
   bucket = "${local.name_prefix}-emr-logs-bucket"
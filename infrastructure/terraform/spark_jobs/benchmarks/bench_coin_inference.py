@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compare the row-at-a-time Python `infer_coin` UDF with the native Spark
+column expressions that replaced it.
+
+Usage:
+    spark-submit benchmarks/bench_coin_inference.py --posts 200000
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import time
+
+from pyspark.sql import SparkSession, functions, types
+
+JOBS_DIR = os.path.join(os.path.dirname(__file__), "..")
+JOB_PATH = os.path.join(JOBS_DIR, "sentiment_and_join-3.py")
+
+FILLER = ["price", "market", "today", "wallet", "fees", "moon", "the", "is", "and", "why", "hodl"]
+SUBREDDITS = ["Bitcoin", "ethereum", "dogecoin", "CryptoCurrency"]
+
+
+def load_job_module():
+    # Helper modules (schemas.py) are normally shipped with spark.submit.pyFiles
+    sys.path.insert(0, JOBS_DIR)
+    spec = importlib.util.spec_from_file_location("sentiment_and_join", JOB_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_legacy_udf(coin_aliases):
+    # The original implementation, kept here as the baseline
+    @functions.udf(returnType=types.StringType())
+    def infer_coin_udf(subreddit, title, text):
+        s = (subreddit or "").lower()
+        t = f"{title or ''} {text or ''}".lower()
+        for coin, aliases in coin_aliases.items():
+            if s == coin:
+                return coin
+            for alias in aliases:
+                if f" {alias} " in f" {t} ":
+                    return coin
+        return None
+
+    return infer_coin_udf
+
+
+def synthetic_posts(n: int, coin_aliases, seed: int = 11):
+    rng = random.Random(seed)
+    aliases = [alias for names in coin_aliases.values() for alias in names]
+    rows = []
+    for i in range(n):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(5, 120))]
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(aliases))
+        rows.append((f"p{i}", rng.choice(SUBREDDITS), " ".join(words[:8]), " ".join(words[8:])))
+    return rows
+
+
+def timed_count(df) -> float:
+    start = time.perf_counter()
+    df.filter(functions.col("coin").isNotNull()).count()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=200000)
+    args = parser.parse_args()
+
+    job = load_job_module()
+    spark = SparkSession.builder.appName("CoinInferenceBenchmark").getOrCreate()
+    posts = spark.createDataFrame(
+        synthetic_posts(args.posts, job.COIN_ALIASES), ["id", "subreddit", "title", "text"]
+    ).cache()
+    posts.count()
+
+    coin_args = (functions.col("subreddit"), functions.col("title"), functions.col("text"))
+    legacy = posts.withColumn("coin", build_legacy_udf(job.COIN_ALIASES)(*coin_args))
+    native = posts.withColumn("coin", job.infer_coin(*coin_args))
+    multi = posts.withColumn("coin", functions.explode(job.infer_coins(*coin_args)))
+
+    udf_elapsed = timed_count(legacy)
+    native_elapsed = timed_count(native)
+    multi_elapsed = timed_count(multi)
+
+    mismatches = (
+        legacy.select("id", functions.col("coin").alias("legacy_coin"))
+        .join(native.select("id", "coin"), on="id")
+        .filter(~functions.col("legacy_coin").eqNullSafe(functions.col("coin")))
+        .count()
+    )
+
+    print(f"posts:              {args.posts}")
+    print(f"python udf:         {udf_elapsed:.2f}s")
+    print(f"native first-coin:  {native_elapsed:.2f}s ({udf_elapsed / native_elapsed:.1f}x)")
+    print(f"native multi-coin:  {multi_elapsed:.2f}s ({udf_elapsed / multi_elapsed:.1f}x)")
+    print(f"mismatched tags:    {mismatches}")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Compare the extractor's two raw formats on the same synthetic Reddit hour:
+bytes stored and Spark read time for gzip NDJSON versus Parquet.
+
+Both layouts hold the same posts split into objects of --batch records, as
+BatchedS3Writer would write them. Parquet files are produced with the
+extractor's own encoder (app/data-extractor/utils/parquet_utils.py).
+
+Usage:
+    spark-submit benchmarks/bench_raw_format.py --posts 50000 --batch 1000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from pyspark.sql import SparkSession, functions
+
+JOBS_DIR = os.path.join(os.path.dirname(__file__), "..")
+EXTRACTOR_DIR = os.path.join(JOBS_DIR, "..", "..", "..", "app", "data-extractor")
+sys.path.insert(0, JOBS_DIR)
+sys.path.insert(0, EXTRACTOR_DIR)
+from schemas import REDDIT_POST_SCHEMA, read_raw, release_raw_reads  # noqa: E402
+from utils.parquet_utils import encode_parquet  # noqa: E402
+
+WORDS = ["bitcoin", "eth", "moon", "dump", "hodl", "wallet", "fees", "the", "is", "to", "rally", "doge"]
+
+
+def synthetic_posts(n: int, seed: int = 5):
+    rng = random.Random(seed)
+    start = datetime(2025, 11, 25, 21, tzinfo=timezone.utc)
+    for i in range(n):
+        yield {
+            "id": f"p{i:07d}",
+            "title": " ".join(rng.choice(WORDS) for _ in range(8)),
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 200))),
+            "subreddit": rng.choice(["Bitcoin", "ethereum", "dogecoin"]),
+            "timestamp": (start + timedelta(seconds=rng.randint(0, 3599))).isoformat(),
+            "upvotes": rng.randint(0, 500),
+            "num_comments": rng.randint(0, 80),
+            "coin_mentions": {rng.choice(["bitcoin", "ethereum", "dogecoin"]): rng.randint(1, 3)},
+        }
+
+
+def write_hour(root: str, posts, batch: int):
+    json_dir = os.path.join(root, "json", "2025", "11", "25", "21")
+    parquet_dir = os.path.join(root, "parquet", "2025", "11", "25", "21")
+    os.makedirs(json_dir)
+    os.makedirs(parquet_dir)
+    for n, start in enumerate(range(0, len(posts), batch)):
+        chunk = posts[start:start + batch]
+        with gzip.open(os.path.join(json_dir, f"{n:05d}.json.gz"), "wt", encoding="utf-8") as fh:
+            fh.write("\n".join(json.dumps(p, ensure_ascii=False, separators=(",", ":")) for p in chunk))
+        with open(os.path.join(parquet_dir, f"{n:05d}.parquet"), "wb") as fh:
+            fh.write(encode_parquet(chunk, "reddit/cryptocurrency"))
+    return json_dir, parquet_dir
+
+
+def dir_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def timed(action, repeats: int = 3):
+    # Best of `repeats`, so JVM warm-up does not favour whichever format runs second
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = action()
+        best = min(best, time.perf_counter() - start)
+        # Each repeat parses the JSON again instead of reading the previous one's cache
+        release_raw_reads()
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    spark = SparkSession.builder.appName("RawFormatBenchmark").getOrCreate()
+    posts = list(synthetic_posts(args.posts))
+    with tempfile.TemporaryDirectory() as root:
+        json_dir, parquet_dir = write_hour(root, posts, args.batch)
+        results = {}
+        for fmt, path in (("json", json_dir), ("parquet", parquet_dir)):
+            full, rows = timed(lambda: read_raw(spark, path, REDDIT_POST_SCHEMA, fmt).count())
+            # The job's hot path only needs a few columns; Parquet can skip the rest
+            pruned, _ = timed(lambda: read_raw(spark, path, REDDIT_POST_SCHEMA, fmt)
+                              .select("id", "timestamp", functions.length("text")).collect())
+            results[fmt] = (dir_bytes(path), full, pruned, rows)
+
+    json_bytes, json_full, json_pruned, json_rows = results["json"]
+    pq_bytes, pq_full, pq_pruned, pq_rows = results["parquet"]
+    assert json_rows == pq_rows == args.posts, (json_rows, pq_rows)
+
+    print(f"posts / objects:      {args.posts} / {-(-args.posts // args.batch)}")
+    print(f"bytes json.gz:        {json_bytes:,}")
+    print(f"bytes parquet:        {pq_bytes:,} ({pq_bytes / json_bytes:.2f}x)")
+    print(f"count json.gz:        {json_full:.2f}s")
+    print(f"count parquet:        {pq_full:.2f}s ({json_full / pq_full:.2f}x faster)")
+    print(f"3 columns json.gz:    {json_pruned:.2f}s")
+    print(f"3 columns parquet:    {pq_pruned:.2f}s ({json_pruned / pq_pruned:.2f}x faster)")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
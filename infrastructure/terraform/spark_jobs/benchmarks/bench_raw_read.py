@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Time reading a synthetic raw Reddit hour (thousands of small .json.gz files,
+one post per file as written by save_to_s3) with JSON schema inference versus
+the explicit REDDIT_POST_SCHEMA.
+
+Usage:
+    spark-submit benchmarks/bench_raw_read.py --files 5000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from pyspark.sql import SparkSession
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from schemas import REDDIT_POST_SCHEMA, read_raw_json, release_raw_reads  # noqa: E402
+
+WORDS = ["bitcoin", "eth", "moon", "dump", "hodl", "wallet", "fees", "the", "is", "to", "rally"]
+
+
+def write_synthetic_hour(root: str, files: int, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    hour_dir = os.path.join(root, "raw", "reddit", "cryptocurrency", "2025", "11", "25", "21")
+    os.makedirs(hour_dir)
+    start = datetime(2025, 11, 25, 21, tzinfo=timezone.utc)
+    for i in range(files):
+        post = {
+            "id": f"p{i:06d}",
+            "title": " ".join(rng.choice(WORDS) for _ in range(8)),
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 200))),
+            "subreddit": rng.choice(["Bitcoin", "ethereum", "dogecoin"]),
+            "timestamp": (start + timedelta(seconds=rng.randint(0, 3599))).isoformat(),
+            "upvotes": rng.randint(0, 500),
+            "num_comments": rng.randint(0, 80),
+        }
+        with gzip.open(os.path.join(hour_dir, f"{i:06d}.json.gz"), "wt", encoding="utf-8") as fh:
+            fh.write(json.dumps(post, separators=(",", ":")))
+    return hour_dir
+
+
+def timed(read):
+    start = time.perf_counter()
+    df = read()
+    rows = df.select("id", "timestamp", "text").count()
+    return time.perf_counter() - start, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=5000)
+    args = parser.parse_args()
+
+    spark = SparkSession.builder.appName("RawReadBenchmark").getOrCreate()
+    with tempfile.TemporaryDirectory() as root:
+        hour_dir = write_synthetic_hour(root, args.files)
+
+        inferred_elapsed, inferred_rows = timed(
+            lambda: spark.read.option("recursiveFileLookup", "true").json(hour_dir)
+        )
+        explicit_elapsed, explicit_rows = timed(
+            lambda: read_raw_json(spark, hour_dir, REDDIT_POST_SCHEMA)
+        )
+        release_raw_reads()
+        # A bare count() only needs the corrupt-record column, which Spark will not scan raw JSON for
+        assert read_raw_json(spark, hour_dir, REDDIT_POST_SCHEMA).count() == args.files
+        release_raw_reads()
+
+    print(f"files:            {args.files}")
+    print(f"schema inference: {inferred_elapsed:.2f}s ({inferred_rows} rows)")
+    print(f"explicit schema:  {explicit_elapsed:.2f}s ({explicit_rows} rows)")
+    print(f"speedup:          {inferred_elapsed / explicit_elapsed:.2f}x")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare posts/second of the per-row, batched and length-bucketed sentiment
+inference paths on CPU.
+
+Usage:
+    python benchmarks/bench_sentiment_inference.py --model ./hf_model --posts 512
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+JOBS_DIR = os.path.join(os.path.dirname(__file__), "..")
+JOB_PATH = os.path.join(JOBS_DIR, "sentiment_and_join-3.py")
+
+WORDS = [
+    "bitcoin", "eth", "moon", "dump", "pump", "hodl", "bearish", "bullish", "fees",
+    "wallet", "exchange", "crash", "rally", "buy", "sell", "the", "is", "going", "to",
+]
+
+
+def load_job_module():
+    # Helper modules (schemas.py) are normally shipped with spark.submit.pyFiles
+    sys.path.insert(0, JOBS_DIR)
+    spec = importlib.util.spec_from_file_location("sentiment_and_join", JOB_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_posts(n: int, seed: int = 7) -> pd.Series:
+    """Reddit-like texts: some empty, most short, a long tail of long posts."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.15:
+            texts.append("")
+            continue
+        length = rng.randint(5, 40) if roll < 0.85 else rng.randint(200, 1500)
+        texts.append(" ".join(rng.choice(WORDS) for _ in range(length)))
+    return pd.Series(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="./hf_model", help="Local Hugging Face model directory")
+    parser.add_argument("--posts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    torch.set_num_threads(os.cpu_count() or 1)
+    job = load_job_module()
+    texts = synthetic_posts(args.posts)
+
+    row_model = pipeline("sentiment-analysis", model=args.model, tokenizer=args.model, device=-1)
+    start = time.perf_counter()
+    job._score_texts_per_row(row_model, texts)
+    row_elapsed = time.perf_counter() - start
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model)
+    model.eval()
+    start = time.perf_counter()
+    job._score_texts_batched(tokenizer, model, texts, args.batch_size, bucket_by_length=False)
+    batched_elapsed = time.perf_counter() - start
+
+    padding_stats = {}
+    start = time.perf_counter()
+    job._score_texts_batched(tokenizer, model, texts, args.batch_size,
+                             bucket_by_length=True, padding_stats=padding_stats)
+    bucketed_elapsed = time.perf_counter() - start
+
+    real = padding_stats["real_tokens"]
+    print(f"posts:     {len(texts)} (batch_size={args.batch_size})")
+    print(f"per-row:   {len(texts) / row_elapsed:8.1f} posts/s ({row_elapsed:.2f}s)")
+    print(f"batched:   {len(texts) / batched_elapsed:8.1f} posts/s ({batched_elapsed:.2f}s), "
+          f"padding ratio {1 - real / padding_stats['unbucketed_padded_tokens']:.1%}")
+    print(f"bucketed:  {len(texts) / bucketed_elapsed:8.1f} posts/s ({bucketed_elapsed:.2f}s), "
+          f"padding ratio {1 - real / padding_stats['padded_tokens']:.1%}")
+    print(f"speedup:   {row_elapsed / bucketed_elapsed:.2f}x over per-row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Compact a closed raw hour into a few Parquet files plus a manifest.
+
+For every raw source (Reddit posts, CoinGecko prices) the hour's small
+extractor objects are merged into compacted/<source>/YYYY/MM/DD/HH/, sized
+to roughly --target-file-mb per file, and _manifest.json is written last.
+Re-running an hour deletes the manifest, overwrites the files and writes a
+fresh manifest, so it is safe to repeat. Raw objects are left in place and
+expire with the raw/ lifecycle rule.
+
+Usage:
+    spark-submit compact_raw.py s3a://sparkling-water-dev-data-bucket 2025/11/25/21
+    spark-submit compact_raw.py file:///tmp/bucket 2025/11/25/21 --force
+"""
+
+import argparse
+import json
+import math
+import os
+from datetime import datetime, timedelta, timezone
+
+from pyspark.sql import SparkSession
+
+from compaction import (
+    MANIFEST_NAME, RAW_SOURCES, SOURCE_KEY_COLUMN, compacted_hour_path, delete_path, list_files, object_key,
+    raw_hour_path, with_source_key, write_text,
+)
+from schemas import COINGECKO_PRICE_SCHEMA, REDDIT_POST_SCHEMA, read_raw, release_raw_reads
+
+SOURCE_SCHEMAS = {
+    "reddit/cryptocurrency": REDDIT_POST_SCHEMA,
+    "coingecko": COINGECKO_PRICE_SCHEMA,
+}
+RAW_INPUT_FORMAT = os.getenv("RAW_INPUT_FORMAT", "auto")
+TARGET_FILE_MB = int(os.getenv("COMPACTION_TARGET_FILE_MB", "128"))
+# An hour is closed once this long has passed after its end, leaving room for slow uploads
+CLOSE_GRACE_MINUTES = int(os.getenv("COMPACTION_CLOSE_GRACE_MINUTES", "15"))
+
+
+def create_spark_session(app_name="RawCompaction"):
+    return SparkSession.builder \
+        .appName(app_name) \
+        .config("spark.sql.adaptive.enabled", "true") \
+        .getOrCreate()
+
+
+def hour_is_closed(hour: str, now: datetime = None, grace_minutes: int = CLOSE_GRACE_MINUTES) -> bool:
+    hour_start = datetime.strptime(hour, "%Y/%m/%d/%H").replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return now >= hour_start + timedelta(hours=1, minutes=grace_minutes)
+
+
+def compact_source(spark: SparkSession, root: str, source: str, hour: str, target_file_mb: int = TARGET_FILE_MB):
+    """Compact one source's hour; returns its manifest, or None when the hour has no raw objects."""
+    raw_path = raw_hour_path(root, source, hour)
+    output_path = compacted_hour_path(root, source, hour)
+    inputs = list_files(spark, raw_path)
+    if not inputs:
+        print(f"No raw objects for {source} {hour}, skipping")
+        return None
+
+    input_bytes = sum(inputs.values())
+    # Raw objects are gzip JSON or Parquet, so their size is a fair estimate of the Parquet output
+    num_files = max(1, math.ceil(input_bytes / (target_file_mb * 1024 * 1024)))
+
+    # Readers only trust the compacted files while a manifest exists
+    delete_path(spark, f"{output_path}/{MANIFEST_NAME}")
+    df = with_source_key(
+        read_raw(spark, list(inputs), SOURCE_SCHEMAS[source], RAW_INPUT_FORMAT, keep_source_file=True)
+    ).cache()
+    records = df.count()
+    df.coalesce(num_files).write.mode("overwrite").parquet(output_path)
+    df.unpersist()
+    release_raw_reads()
+
+    outputs = list_files(spark, output_path)
+    manifest = {
+        "source": source,
+        "hour": hour,
+        "format": "parquet",
+        "compacted_at": datetime.now(timezone.utc).isoformat(),
+        "records": records,
+        "input_bytes": input_bytes,
+        "inputs": sorted(object_key(path) for path in inputs),
+        "source_key_column": SOURCE_KEY_COLUMN,
+        "outputs": [{"path": object_key(path), "size_bytes": size} for path, size in sorted(outputs.items())],
+    }
+    write_text(spark, f"{output_path}/{MANIFEST_NAME}", json.dumps(manifest, indent=2))
+    print(f"Compacted {len(inputs)} objects ({records} records) of {source} {hour} into {len(outputs)} files")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="bucket root, e.g. s3a://bucket or file:///tmp/bucket")
+    parser.add_argument("hour", help="hour partition as YYYY/MM/DD/HH")
+    parser.add_argument("--sources", nargs="+", default=list(RAW_SOURCES), choices=list(RAW_SOURCES))
+    parser.add_argument("--target-file-mb", type=int, default=TARGET_FILE_MB)
+    parser.add_argument("--force", action="store_true", help="compact even if the hour is not closed yet")
+    args = parser.parse_args()
+
+    if not args.force and not hour_is_closed(args.hour):
+        raise SystemExit(f"Hour {args.hour} is not closed yet; pass --force to compact it anyway")
+
+    spark = create_spark_session()
+    try:
+        for source in args.sources:
+            compact_source(spark, args.root, source, args.hour, args.target_file_mb)
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    main()
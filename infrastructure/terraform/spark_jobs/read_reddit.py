@@ -5,6 +5,7 @@ import argparse
 from pyspark.sql import SparkSession
 from pyspark.sql.functions import avg, col, count, when, isnan, isnull, max as F_max, min as F_min
 from pyspark.sql.types import *
+from schemas import REDDIT_POST_SCHEMA, read_raw_json, release_raw_reads
 
 
 def create_spark_session(app_name="RedditDataProcessor"):
@@ -19,8 +20,8 @@ def create_spark_session(app_name="RedditDataProcessor"):
 def read_reddit_data(spark, input_path):
     """Read Reddit data from S3 input path"""
     try:
-        # Try to read as JSON first (most common format for Reddit data)
-        df = spark.read.option("multiline", "true").json(input_path)
+        # Try to read as JSON first with the extractor's schema (no inference pass)
+        df = read_raw_json(spark, input_path, REDDIT_POST_SCHEMA)
         print(f"Successfully read data from {input_path}")
         print(f"Number of records: {df.count()}")
         return df
@@ -166,6 +167,7 @@ def main():
         print(f"Error processing Reddit data: {e}")
         raise
     finally:
+        release_raw_reads()
         spark.stop()
 
 
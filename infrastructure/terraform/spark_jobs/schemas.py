@@ -0,0 +1,132 @@
+"""
+Schemas for the raw records written by the data extractor.
+
+REDDIT_POST_SCHEMA matches fetchers.reddit_fetcher.fetch_reddit_posts and
+COINGECKO_PRICE_SCHEMA matches fetchers.coingecko.fetch_prices. Readers pass
+them to spark.read so Spark never runs a schema-inference pass over the raw
+files. The extractor's Parquet output (utils/parquet_utils.py) uses the same
+columns and types. Shipped to EMR through spark.submit.pyFiles.
+"""
+from typing import List, Optional, Union
+
+from pyspark.sql import DataFrame, SparkSession, functions
+from pyspark.sql.types import (
+    DoubleType,
+    IntegerType,
+    LongType,
+    MapType,
+    StringType,
+    StructField,
+    StructType,
+)
+
+CORRUPT_RECORD_COLUMN = "_corrupt_record"
+SOURCE_FILE_COLUMN = "source_file"
+RAW_FORMATS = ("json", "parquet", "auto")
+JSON_GLOB = "*.json*"
+PARQUET_GLOB = "*.parquet"
+# Parsed JSON frames cached by read_raw_json, until release_raw_reads
+_cached_reads: List[DataFrame] = []
+
+REDDIT_POST_SCHEMA = StructType([
+    StructField("id", StringType()),
+    StructField("title", StringType()),
+    StructField("text", StringType()),
+    StructField("subreddit", StringType()),
+    StructField("timestamp", StringType()),
+    StructField("upvotes", LongType()),
+    StructField("num_comments", LongType()),
+    StructField("coin_mentions", MapType(StringType(), IntegerType())),
+])
+
+COINGECKO_PRICE_SCHEMA = StructType([
+    StructField("coin", StringType()),
+    StructField("price_usd", DoubleType()),
+    StructField("timestamp", StringType()),
+])
+
+
+def with_corrupt_record(schema: StructType) -> StructType:
+    return StructType(schema.fields + [StructField(CORRUPT_RECORD_COLUMN, StringType())])
+
+
+def read_raw_json(spark: SparkSession, path: Union[str, List[str]], schema: StructType,
+                  corrupt_output_path: Optional[str] = None, path_glob: Optional[str] = None,
+                  keep_source_file: bool = False) -> DataFrame:
+    """
+    Read raw extractor JSON with a fixed schema.
+
+    Malformed records are dropped from the result; when `corrupt_output_path`
+    is set they are appended there as (source_file, _corrupt_record) rows.
+    `path_glob` restricts which file names are read, and `keep_source_file`
+    keeps each record's object path in a source_file column.
+
+    The parsed records are cached: Spark refuses to scan raw JSON for
+    nothing but the corrupt-record column, which is all a count() of the
+    result would need. Call release_raw_reads() after the last action.
+    """
+    reader = spark.read
+    if path_glob:
+        reader = reader.option("pathGlobFilter", path_glob)
+    df = reader \
+        .schema(with_corrupt_record(schema)) \
+        .option("recursiveFileLookup", "true") \
+        .option("mode", "PERMISSIVE") \
+        .option("columnNameOfCorruptRecord", CORRUPT_RECORD_COLUMN) \
+        .json(path)
+
+    if corrupt_output_path or keep_source_file:
+        df = df.withColumn(SOURCE_FILE_COLUMN, functions.input_file_name())
+    # Also lets the side output and the main read share a single scan
+    df = df.cache()
+    _cached_reads.append(df)
+    if corrupt_output_path:
+        corrupt = df.filter(functions.col(CORRUPT_RECORD_COLUMN).isNotNull()) \
+            .select(SOURCE_FILE_COLUMN, CORRUPT_RECORD_COLUMN)
+        if corrupt.head(1):
+            corrupt.write.mode("append").json(corrupt_output_path)
+            print(f"Wrote malformed records from {path} to {corrupt_output_path}")
+    if not keep_source_file and SOURCE_FILE_COLUMN in df.columns:
+        df = df.drop(SOURCE_FILE_COLUMN)
+
+    return df.filter(functions.col(CORRUPT_RECORD_COLUMN).isNull()).drop(CORRUPT_RECORD_COLUMN)
+
+
+def release_raw_reads() -> None:
+    """Unpersist the parsed records cached by read_raw_json; run no further actions on the frames it returned."""
+    while _cached_reads:
+        _cached_reads.pop().unpersist()
+
+
+def read_raw_parquet(spark: SparkSession, path: Union[str, List[str]], schema: StructType,
+                     keep_source_file: bool = False) -> DataFrame:
+    """Read raw extractor Parquet files; only the schema's columns are selected."""
+    paths = [path] if isinstance(path, str) else path
+    columns = [functions.col(name) for name in schema.fieldNames()]
+    if keep_source_file:
+        columns.append(functions.input_file_name().alias(SOURCE_FILE_COLUMN))
+    return spark.read \
+        .schema(schema) \
+        .option("recursiveFileLookup", "true") \
+        .option("pathGlobFilter", PARQUET_GLOB) \
+        .parquet(*paths) \
+        .select(*columns)
+
+
+def read_raw(spark: SparkSession, path: Union[str, List[str]], schema: StructType, fmt: str = "json",
+             corrupt_output_path: Optional[str] = None, keep_source_file: bool = False) -> DataFrame:
+    """
+    Read a raw partition written as JSON, Parquet or ("auto") a mix of both.
+
+    "auto" is meant for the switch-over period, when an hour can hold objects
+    of either format.
+    """
+    if fmt not in RAW_FORMATS:
+        raise ValueError(f"Unsupported raw format '{fmt}', expected one of {RAW_FORMATS}")
+    if fmt == "json":
+        return read_raw_json(spark, path, schema, corrupt_output_path, keep_source_file=keep_source_file)
+    if fmt == "parquet":
+        return read_raw_parquet(spark, path, schema, keep_source_file)
+    json_df = read_raw_json(spark, path, schema, corrupt_output_path, path_glob=JSON_GLOB,
+                            keep_source_file=keep_source_file)
+    return json_df.unionByName(read_raw_parquet(spark, path, schema, keep_source_file))
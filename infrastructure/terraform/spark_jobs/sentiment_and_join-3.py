@@ -1,5 +1,7 @@
 import os
-from datetime import datetime
+import re
+import json
+from datetime import datetime, timedelta
 from typing import List
 from decimal import Decimal
 os.environ["PYTORCH_ENABLE_MPS_FALLBACK"] = "1"
@@ -7,12 +9,65 @@ os.environ["TRANSFORMERS_OFFLINE"] = "1"
 os.environ["HF_HUB_OFFLINE"] = "1"
 import boto3
 import sys
-from pyspark.sql import SparkSession, DataFrame, functions, types
+from pyspark.sql import Column, SparkSession, DataFrame, Window, functions, types
 from pyspark.sql.functions import col, pandas_udf, PandasUDFType
-from pyspark.sql.types import StructType, StructField, StringType, FloatType
+from pyspark.sql.types import StructType, StructField, StringType, FloatType, MapType, IntegerType
+from pyspark.sql.utils import AnalysisException
+from schemas import COINGECKO_PRICE_SCHEMA, REDDIT_POST_SCHEMA, read_raw, release_raw_reads
+from compaction import (
+    MANIFEST_NAME, compacted_source_keys, hour_exists, list_files, load_manifest, object_key, raw_hour_path,
+    read_compacted_objects, read_hour, read_text, with_source_key, write_text,
+)
 
 
 RAW_REDDIT_PATH = "raw/reddit/cryptocurrency"
+CORRUPT_RECORDS_PATH = "processed/corrupt"
+# "incremental" scores only raw objects missing from each partition's manifest and merges them into
+# per-hour state before overwriting the hour's output; "full" re-reads whole hours and appends
+PROCESSING_MODE = os.getenv("PROCESSING_MODE", "incremental")
+PROCESSED_MANIFEST_PATH = "processed/manifests/reddit"
+HOURLY_STATE_PATH = "processed/hourly_state"
+JOINED_OUTPUT_PATH = "processed/joined"
+STATE_SUM_COLUMNS = (
+    "post_count", "scored_count", "sentiment_sum", "sentiment_sq_sum", "positive_count", "negative_count", "neutral_count",
+)
+# Hourly and daily rollups per coin for the dashboard. Every column is a count, sum, min, max or
+# first/last value, so buckets merge into any range without reading the per-hour items
+ROLLUPS_ENABLED = os.getenv("ROLLUPS_ENABLED", "true").lower() == "true"
+HOURLY_ROLLUP_PATH = "processed/rollups/hourly"
+ROLLUP_TABLE_NAME = os.getenv("ROLLUP_TABLE_NAME", "sparkling-water-dev-crypto-sentiment-rollups")
+# point_* are the moments of the hourly (average price, mean sentiment) pairs the dashboard correlates
+ROLLUP_SUM_COLUMNS = STATE_SUM_COLUMNS + (
+    "price_sum", "price_sample_count", "point_count", "point_price_sum", "point_price_sq_sum",
+    "point_score_sum", "point_score_sq_sum", "point_cross_sum",
+)
+# Format of the extractor's raw objects: "json", "parquet", or "auto" for either. "auto" reads
+# whatever RAW_OUTPUT_FORMAT the extractor uses, so switching it alone never leaves the job reading nothing
+RAW_INPUT_FORMAT = os.getenv("RAW_INPUT_FORMAT", "auto")
+SENTIMENT_MODEL_PATH = "./hf_model"
+SENTIMENT_MAX_LENGTH = 512
+# "batched" runs micro-batched forward passes, "row" calls the pipeline once per post
+SENTIMENT_INFERENCE_MODE = os.getenv("SENTIMENT_INFERENCE_MODE", "batched")
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+# Sort texts by token count inside each Arrow batch to minimise padding
+SENTIMENT_LENGTH_BUCKETING = os.getenv("SENTIMENT_LENGTH_BUCKETING", "true").lower() == "true"
+PADDING_METRIC_NAMES = ("real_tokens", "padded_tokens", "unbucketed_padded_tokens")
+# Scored posts are cached per (id, hash(title+text), model version) so re-runs skip inference
+SENTIMENT_CACHE_PATH = "processed/sentiment_cache"
+SENTIMENT_CACHE_ENABLED = os.getenv("SENTIMENT_CACHE_ENABLED", "true").lower() == "true"
+SENTIMENT_MODEL_VERSION = os.getenv("SENTIMENT_MODEL_VERSION", "hf_model-v1")
+# "exact" joins prices of the same hour, "asof" the latest price hour at or before it
+PRICE_JOIN_MODE = os.getenv("PRICE_JOIN_MODE", "exact")
+# In "asof" mode prices are loaded this many hours back, and an older price is never used
+PRICE_ASOF_MAX_STALENESS_HOURS = int(os.getenv("PRICE_ASOF_MAX_STALENESS_HOURS", "6"))
+DYNAMODB_TABLE_NAME = os.getenv("DYNAMODB_TABLE_NAME", "sparkling-water-dev-crypto-sentiment")
+DYNAMODB_REGION = os.getenv("AWS_REGION", "us-east-1")
+# Point at a local DynamoDB stand-in (e.g. http://localhost:8000) for testing
+DYNAMODB_ENDPOINT_URL = os.getenv("DYNAMODB_ENDPOINT_URL") or None
+DYNAMODB_BATCH_SIZE = 25
+DYNAMODB_WRITE_CONCURRENCY = int(os.getenv("DYNAMODB_WRITE_CONCURRENCY", "4"))
+DYNAMODB_MAX_RETRIES = 8
+DYNAMODB_MAX_BACKOFF_SECONDS = 5.0
 COIN_ALIASES = {
     "bitcoin": ["bitcoin", "btc", "₿"],
     "ethereum": ["ethereum", "eth", "ether"],
@@ -20,6 +75,13 @@ COIN_ALIASES = {
     "dogecoin": ["dogecoin", "doge"],
     "cardano": ["cardano", "ada"],
 }
+# Seen-post index written by the extractor ({post id: "YYYY/MM/DD/HH"}); copies of a post
+# outside its indexed hour were already counted there and are dropped
+POST_DEDUPE_ENABLED = os.getenv("POST_DEDUPE_ENABLED", "true").lower() == "true"
+SEEN_POST_INDEX_KEY = os.getenv("SEEN_INDEX_KEY", "state/reddit_seen_ids.json")
+# "first" tags a post with its first matching coin, "multi" with every coin it mentions,
+# "mentions" like "multi" but via the Aho-Corasick matcher, keeping per-coin mention counts
+COIN_TAGGING_MODE = os.getenv("COIN_TAGGING_MODE", "first")
 
 
 def initialize_spark(app_name: str):
@@ -28,10 +90,136 @@ def initialize_spark(app_name: str):
         .appName(app_name) \
         .config("spark.sql.execution.pyspark.udf.faulthandler.enabled", "true") \
         .config("spark.sql.adaptive.enabled", "true") \
+        .config("spark.sql.session.timeZone", "UTC") \
         .getOrCreate()
     return spark
 
-def build_sentiment_udf():
+def _signed_score(label: str, confidence: float) -> float:
+    if label == "positive":
+        return confidence
+    if label == "negative":
+        return -confidence
+    return 0.0
+
+
+def _score_texts_per_row(model, texts):
+    # Original path: one pipeline call per post
+    labels, scores = [], []
+    for t in texts.fillna(""):
+        if not t.strip():
+            labels.append("neutral")
+            scores.append(0.0)
+        else:
+            result = model(t[:SENTIMENT_MAX_LENGTH])[0]
+            label = result["label"].lower()
+            labels.append(label)
+            scores.append(_signed_score(label, float(result["score"])))
+    return labels, scores
+
+
+def _padded_token_count(lengths, batch_size: int) -> int:
+    # Every micro-batch is padded to its longest member
+    return sum(
+        int(lengths[start:start + batch_size].max()) * len(lengths[start:start + batch_size])
+        for start in range(0, len(lengths), batch_size)
+    )
+
+
+def _score_texts_batched(tokenizer, model, texts, batch_size: int,
+                         bucket_by_length: bool = SENTIMENT_LENGTH_BUCKETING,
+                         padding_stats: dict = None):
+    """
+    Score a pandas Series of texts in micro-batches.
+
+    With `bucket_by_length` the non-empty texts are ordered by token count so
+    each micro-batch is padded to a near-identical length; results are written
+    back in the original row order. Token counts are added to `padding_stats`
+    (keys in PADDING_METRIC_NAMES) when given.
+    """
+    import numpy as np
+    import torch
+
+    texts = texts.fillna("").astype(str)
+    non_empty = texts.str.strip().str.len().to_numpy() > 0
+
+    labels = np.full(len(texts), "neutral", dtype=object)
+    scores = np.zeros(len(texts), dtype=np.float32)
+    if not non_empty.any():
+        return labels, scores
+
+    id2label = {int(k): v.lower() for k, v in model.config.id2label.items()}
+    max_length = min(SENTIMENT_MAX_LENGTH, tokenizer.model_max_length)
+    encoded = tokenizer(texts[non_empty].tolist(), truncation=True, max_length=max_length)
+    input_ids = encoded["input_ids"]
+    lengths = np.fromiter((len(ids) for ids in input_ids), dtype=np.int64, count=len(input_ids))
+    order = np.argsort(lengths, kind="stable") if bucket_by_length else np.arange(len(lengths))
+
+    if padding_stats is not None:
+        padding_stats["real_tokens"] = padding_stats.get("real_tokens", 0) + int(lengths.sum())
+        padding_stats["padded_tokens"] = (
+            padding_stats.get("padded_tokens", 0) + _padded_token_count(lengths[order], batch_size)
+        )
+        padding_stats["unbucketed_padded_tokens"] = (
+            padding_stats.get("unbucketed_padded_tokens", 0) + _padded_token_count(lengths, batch_size)
+        )
+
+    batch_labels = np.empty(len(order), dtype=object)
+    batch_scores = np.zeros(len(order), dtype=np.float32)
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            positions = order[start:start + batch_size]
+            features = [
+                {key: encoded[key][i] for key in encoded.keys()}
+                for i in positions
+            ]
+            batch = tokenizer.pad(features, padding=True, return_tensors="pt")
+            probs = torch.softmax(model(**batch).logits, dim=-1)
+            confidence, label_ids = probs.max(dim=-1)
+            for position, label_id, conf in zip(positions, label_ids.tolist(), confidence.tolist()):
+                label = id2label[label_id]
+                batch_labels[position] = label
+                batch_scores[position] = _signed_score(label, conf)
+
+    labels[non_empty] = batch_labels
+    scores[non_empty] = batch_scores
+    return labels, scores
+
+
+def create_padding_metrics(spark: SparkSession) -> dict:
+    return {name: spark.sparkContext.accumulator(0) for name in PADDING_METRIC_NAMES}
+
+
+def report_padding_metrics(padding_metrics: dict):
+    real = padding_metrics["real_tokens"].value
+    padded = padding_metrics["padded_tokens"].value
+    unbucketed = padding_metrics["unbucketed_padded_tokens"].value
+    if not padded:
+        return
+    print(
+        f"Sentiment padding: {real} real tokens, {padded} padded "
+        f"(padding ratio {1 - real / padded:.1%}); without bucketing {unbucketed} "
+        f"(padding ratio {1 - real / unbucketed:.1%}), saved {1 - padded / unbucketed:.1%}"
+    )
+
+
+def build_sentiment_udf(mode: str = SENTIMENT_INFERENCE_MODE,
+                        batch_size: int = SENTIMENT_BATCH_SIZE,
+                        bucket_by_length: bool = SENTIMENT_LENGTH_BUCKETING,
+                        padding_metrics: dict = None):
+    """
+    Build the sentiment pandas UDF.
+
+    mode="batched" tokenizes each Arrow batch with padding/truncation and runs
+    forward passes in micro-batches of `batch_size`, bucketing texts by token
+    count when `bucket_by_length` is set; mode="row" keeps the original
+    one-pipeline-call-per-post behaviour. `padding_metrics` are the
+    accumulators from create_padding_metrics().
+    """
+    if mode not in ("batched", "row"):
+        raise ValueError(f"Unknown sentiment inference mode: {mode}")
+    if batch_size <= 0:
+        raise ValueError("Sentiment batch size must be a positive integer")
+
     # Define the schema for the UDF output
     sentiment_schema = StructType([
         StructField("sentiment_label", StringType()),
@@ -41,36 +229,116 @@ def build_sentiment_udf():
     @pandas_udf(sentiment_schema, functionType=PandasUDFType.SCALAR_ITER)
     def sentiment_udf(texts_iter):
         import pandas as pd
-        from transformers import pipeline
 
-        model = pipeline(
-            "sentiment-analysis",
-            model="./hf_model",
-            tokenizer="./hf_model",
-            device=-1,
-        )
+        if mode == "row":
+            from transformers import pipeline
+
+            model = pipeline(
+                "sentiment-analysis",
+                model=SENTIMENT_MODEL_PATH,
+                tokenizer=SENTIMENT_MODEL_PATH,
+                device=-1,
+            )
+            for texts in texts_iter:
+                labels, scores = _score_texts_per_row(model, texts)
+                yield pd.DataFrame({"sentiment_label": labels, "sentiment_score": scores})
+            return
+
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_PATH)
+        model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_PATH)
+        model.eval()
         for texts in texts_iter:
-            labels, scores = [], []
-            for t in texts.fillna(""):
-                if not t.strip():
-                    labels.append("neutral")
-                    scores.append(0.0)
-                else:
-                    result = model(t[:512])[0]
-                    label = result["label"].lower()
-                    confidence = float(result["score"])
-                    if label == "positive":
-                        signed_score = confidence
-                    elif label == "negative":
-                        signed_score = -confidence
-                    
-                    labels.append(label)
-                    scores.append(signed_score)
+            padding_stats = {} if padding_metrics is not None else None
+            labels, scores = _score_texts_batched(
+                tokenizer, model, texts, batch_size,
+                bucket_by_length=bucket_by_length,
+                padding_stats=padding_stats,
+            )
+            if padding_stats:
+                for name, value in padding_stats.items():
+                    padding_metrics[name].add(value)
             yield pd.DataFrame({"sentiment_label": labels, "sentiment_score": scores})
 
     return sentiment_udf
 
 
+def apply_sentiment(reddit_df: DataFrame, sentiment_udf) -> DataFrame:
+    return reddit_df.withColumn(
+        "sentiment",
+        sentiment_udf(col("text"))
+    ).select(
+        "*",
+        col("sentiment.sentiment_label").alias("sentiment_label"),
+        col("sentiment.sentiment_score").alias("sentiment_score"))
+
+
+def load_sentiment_cache(spark: SparkSession, cache_path: str, model_version: str):
+    try:
+        cache_df = spark.read.parquet(cache_path)
+    except AnalysisException:
+        # First run: nothing cached yet
+        return None
+    return (
+        cache_df
+        .filter(functions.col("model_version") == model_version)
+        .select("id", "content_hash", "sentiment_label", "sentiment_score")
+        .dropDuplicates(["id", "content_hash"])
+    )
+
+
+def apply_sentiment_with_cache(spark: SparkSession, reddit_df: DataFrame, sentiment_udf,
+                               cache_path: str, model_version: str = SENTIMENT_MODEL_VERSION) -> tuple:
+    """
+    Score posts through the persistent sentiment cache.
+
+    Posts are keyed on (id, sha256(title + text)) within `model_version`; only
+    cache misses go through `sentiment_udf`, and their results are appended to
+    the cache before being joined back onto every raw row.
+
+    Returns (scored rows, scored misses). The misses stay persisted so the
+    model runs once; the caller unpersists them after its last action on
+    the scored rows.
+    """
+    df = reddit_df.withColumn(
+        "content_hash",
+        functions.sha2(
+            functions.concat_ws(
+                "\u0001",
+                functions.coalesce(functions.col("title"), functions.lit("")),
+                functions.coalesce(functions.col("text"), functions.lit("")),
+            ),
+            256,
+        ),
+    )
+    posts = df.select("id", "content_hash", "text").dropDuplicates(["id", "content_hash"])
+
+    cache_df = load_sentiment_cache(spark, cache_path, model_version)
+    misses = posts if cache_df is None else posts.join(cache_df, on=["id", "content_hash"], how="left_anti")
+
+    scored = (
+        apply_sentiment(misses, sentiment_udf)
+        .select("id", "content_hash", "sentiment_label", "sentiment_score")
+        .persist()
+    )
+    miss_count = scored.count()
+    if miss_count:
+        (scored
+            .withColumn("model_version", functions.lit(model_version))
+            .withColumn("scored_at", functions.current_timestamp())
+            .coalesce(1)
+            .write
+            .mode("append")
+            .partitionBy("model_version")
+            .parquet(cache_path)
+        )
+    print(f"Sentiment cache: scored {miss_count} new posts")
+
+    lookup = scored if cache_df is None else cache_df.unionByName(scored)
+    return df.join(lookup, on=["id", "content_hash"], how="left"), scored
+
+
 def parse_legacy_args(argv):
     input_s3 = argv[0]
 
@@ -84,20 +352,61 @@ def parse_legacy_args(argv):
     end = start
     return bucket, start, end
 
-@functions.udf(returnType=types.StringType())
-def infer_coin(subreddit: str, title: str, text: str):
-    s = (subreddit or "").lower()
-    t = f"{title or ''} {text or ''}".lower()
-    
-    for coin, aliases in COIN_ALIASES.items():
-        if s == coin:
-            return coin
-        for alias in aliases:
-            if f" {alias} " in f" {t} ":
-                return coin
-    return None
-
-def prepare_reddit(reddit_df: DataFrame):
+def _alias_regex(aliases: List[str]) -> str:
+    # Longest alias first; boundaries are "not a letter, digit or underscore" so symbols like ₿ match too
+    alternatives = "|".join(re.escape(alias) for alias in sorted(aliases, key=len, reverse=True))
+    return f"(?<![\\p{{L}}\\p{{N}}_])(?:{alternatives})(?![\\p{{L}}\\p{{N}}_])"
+
+
+def _coin_conditions(subreddit: Column, title: Column, text: Column):
+    s = functions.lower(functions.coalesce(subreddit, functions.lit("")))
+    t = functions.lower(functions.concat_ws(" ", title, text))
+    return [
+        (coin, (s == coin) | t.rlike(_alias_regex(aliases)))
+        for coin, aliases in COIN_ALIASES.items()
+    ]
+
+
+def infer_coin(subreddit: Column, title: Column, text: Column) -> Column:
+    """First coin (in COIN_ALIASES order) named by the subreddit or mentioned in title/text."""
+    coin_col = None
+    for coin, condition in _coin_conditions(subreddit, title, text):
+        if coin_col is None:
+            coin_col = functions.when(condition, functions.lit(coin))
+        else:
+            coin_col = coin_col.when(condition, functions.lit(coin))
+    return coin_col
+
+
+def infer_coins(subreddit: Column, title: Column, text: Column) -> Column:
+    """Array of every coin named by the subreddit or mentioned in title/text."""
+    candidates = functions.array(*[
+        functions.when(condition, functions.lit(coin))
+        for coin, condition in _coin_conditions(subreddit, title, text)
+    ])
+    return functions.filter(candidates, lambda coin: coin.isNotNull())
+
+
+def build_coin_mentions_udf(coin_aliases=COIN_ALIASES):
+    """
+    Pandas UDF returning {coin: mention count} per post.
+
+    Requires coin_matcher.py on the Python path (shipped via spark.submit.pyFiles);
+    the automaton is built once per executor process and reused across batches.
+    """
+    @pandas_udf(MapType(StringType(), IntegerType()), functionType=PandasUDFType.SCALAR)
+    def coin_mentions_udf(subreddit, title, text):
+        import pandas as pd
+        from coin_matcher import get_matcher
+
+        matcher = get_matcher(coin_aliases)
+        return pd.Series([matcher.tag(s, ti, te) for s, ti, te in zip(subreddit, title, text)])
+
+    return coin_mentions_udf
+
+def prepare_reddit(reddit_df: DataFrame, coin_tagging: str = COIN_TAGGING_MODE):
+    if coin_tagging not in ("first", "multi", "mentions"):
+        raise ValueError(f"Unknown coin tagging mode: {coin_tagging}")
     df = reddit_df
 
     if "timestamp" in df.columns:
@@ -110,12 +419,15 @@ def prepare_reddit(reddit_df: DataFrame):
     df = df.withColumn("ts_hour", functions.date_trunc("hour", functions.col("created_utc")))
     df = df.drop("created_utc")
 
-    df = df.withColumn("coin", infer_coin(
-            functions.col("subreddit"),
-            functions.col("title"),
-            functions.col("text")
-        )
-    )
+    coin_args = (functions.col("subreddit"), functions.col("title"), functions.col("text"))
+    if coin_tagging == "multi":
+        # One row per mentioned coin so a post contributes to every coin it names
+        df = df.withColumn("coin", functions.explode(infer_coins(*coin_args)))
+    elif coin_tagging == "mentions":
+        df = df.withColumn("coin_mentions", build_coin_mentions_udf()(*coin_args))
+        df = df.select("*", functions.explode("coin_mentions").alias("coin", "mention_count"))
+    else:
+        df = df.withColumn("coin", infer_coin(*coin_args))
  
     if "sentiment" in df.columns and "sentiment_label" not in df.columns:
         df = df.withColumnRenamed("sentiment", "sentiment_label")
@@ -125,18 +437,36 @@ def prepare_reddit(reddit_df: DataFrame):
 
     return df
 
-def aggregate_sentiment(reddit_df: DataFrame):
-   df = reddit_df.filter(functions.col("coin").isNotNull())
-
-
+def aggregate_sentiment_state(reddit_df: DataFrame, keys: List[str] = ()) -> DataFrame:
+   """
+   Mergeable per-(coin, ts_hour) sentiment aggregates: counts and sums that can be added across runs.
 
-   agg = df.groupBy("coin").agg(
+   `keys` adds grouping columns in front of (coin, ts_hour), e.g. the source object.
+   """
+   df = reddit_df.filter(functions.col("coin").isNotNull())
+   return df.groupBy(*keys, "coin", "ts_hour").agg(
+       functions.count(functions.lit(1)).alias("post_count"),
+       functions.count(functions.col("sentiment_score")).alias("scored_count"),
+       functions.sum(functions.col("sentiment_score")).alias("sentiment_sum"),
+       functions.sum(functions.col("sentiment_score") * functions.col("sentiment_score")).alias("sentiment_sq_sum"),
        functions.sum(functions.when(functions.col("sentiment_label") == "positive", 1).otherwise(0)).alias("positive_count"),
        functions.sum(functions.when(functions.col("sentiment_label") == "negative", 1).otherwise(0)).alias("negative_count"),
-       functions.avg(functions.col("sentiment_score")).alias("sentiment_score"),
+       functions.sum(functions.when(functions.col("sentiment_label") == "neutral", 1).otherwise(0)).alias("neutral_count"),
    )
 
 
+def merge_sentiment_state(state: DataFrame) -> DataFrame:
+   return state.groupBy("coin", "ts_hour").agg(
+       *[functions.coalesce(functions.sum(name), functions.lit(0)).alias(name) for name in STATE_SUM_COLUMNS]
+   )
+
+
+def finalize_sentiment(state: DataFrame) -> DataFrame:
+   """Turn merged state into the hourly sentiment rows joined with prices."""
+   agg = state.withColumn(
+       "sentiment_score",
+       functions.when(functions.col("scored_count") > 0, functions.col("sentiment_sum") / functions.col("scored_count")),
+   )
 
    agg = agg.withColumn(
        "sentiment_label",
@@ -145,55 +475,253 @@ def aggregate_sentiment(reddit_df: DataFrame):
                 .otherwise(functions.lit("neutral")),
    )
 
-   final_result = agg.select("coin", "sentiment_label", "sentiment_score", "positive_count", "negative_count")
+   final_result = agg.select("coin", "ts_hour", "sentiment_label", "sentiment_score", "positive_count", "negative_count")
 
    return final_result
 
-def load_coingecko_data(spark: SparkSession, input_s3: str) -> DataFrame:
 
+def aggregate_sentiment(reddit_df: DataFrame):
+   return finalize_sentiment(aggregate_sentiment_state(reddit_df))
+
+
+def with_partition_columns(df: DataFrame) -> DataFrame:
+    """Output partition columns from each row's ts_hour (session time zone is UTC)."""
+    return (
+        df
+        .withColumn("year", functions.date_format("ts_hour", "yyyy"))
+        .withColumn("month", functions.date_format("ts_hour", "MM"))
+        .withColumn("day", functions.date_format("ts_hour", "dd"))
+        .withColumn("hour", functions.date_format("ts_hour", "HH"))
+    )
+
+
+def _manifest_path(bucket: str, partition: str) -> str:
+    return f"s3://{bucket}/{PROCESSED_MANIFEST_PATH}/{partition}/{MANIFEST_NAME}"
+
+
+def load_processed_keys(spark: SparkSession, bucket: str, partition: str) -> set:
+    text = read_text(spark, _manifest_path(bucket, partition))
+    return set(json.loads(text)["processed"]) if text else set()
+
+
+def save_processed_keys(spark: SparkSession, bucket: str, partition: str, keys: set):
+    manifest = {
+        "partition": partition,
+        "updated_at": datetime.utcnow().isoformat(),
+        "processed": sorted(keys),
+    }
+    write_text(spark, _manifest_path(bucket, partition), json.dumps(manifest))
+
+
+def new_raw_files(spark: SparkSession, bucket: str, partition: str, processed: set) -> List[str]:
+    raw_path = raw_hour_path(f"s3://{bucket}", "reddit/cryptocurrency", partition)
+    return [path for path in list_files(spark, raw_path) if object_key(path) not in processed]
+
+
+def read_new_reddit_files(spark: SparkSession, bucket: str, new_files: dict) -> DataFrame:
+    """
+    Read only the given raw objects per partition, tagging each row with its object key (source_key).
+
+    Objects already merged into the hour's compacted Parquet (compact_raw.py)
+    are read from it by source_key; the others from their raw files.
+    """
+    root = f"s3://{bucket}"
+    frames = []
+    for partition, paths in new_files.items():
+        if not paths:
+            continue
+        compacted = compacted_source_keys(load_manifest(spark, root, "reddit/cryptocurrency", partition)) \
+            & {object_key(path) for path in paths}
+        if compacted:
+            frames.append(read_compacted_objects(
+                spark, root, "reddit/cryptocurrency", partition, REDDIT_POST_SCHEMA, compacted
+            ))
+        raw_paths = [path for path in paths if object_key(path) not in compacted]
+        if raw_paths:
+            frames.append(with_source_key(read_raw(
+                spark, raw_paths, REDDIT_POST_SCHEMA, RAW_INPUT_FORMAT,
+                corrupt_output_path=f"s3://{bucket}/{CORRUPT_RECORDS_PATH}/reddit/{partition}",
+                keep_source_file=True,
+            )))
+        print(f"Partition {partition}: {len(compacted)} new objects from compacted Parquet, {len(raw_paths)} raw")
+    df = frames[0]
+    for frame in frames[1:]:
+        df = df.unionByName(frame)
+    return df
+
+
+def update_hourly_state(spark: SparkSession, delta: DataFrame, state_path: str) -> tuple:
+    """
+    Append per-object aggregates to the hourly state and return (merged state, touched hours).
+
+    State rows are keyed by (source_key, coin, ts_hour) and deduplicated on
+    read, so re-running objects whose manifest update was lost never counts
+    them twice.
+    """
+    delta = delta.cache()
+    with_partition_columns(delta).write.mode("append").partitionBy("year", "month", "day", "hour").parquet(state_path)
+    touched = [
+        row.partition
+        for row in delta.select(functions.date_format("ts_hour", "yyyy/MM/dd/HH").alias("partition")).distinct().collect()
+    ]
+    delta.unpersist()
+
+    hour_paths = []
+    for partition in touched:
+        year, month, day, hour = partition.split("/")
+        hour_paths.append(f"{state_path}/year={year}/month={month}/day={day}/hour={hour}")
+    state = spark.read.option("basePath", state_path).option("mergeSchema", "true").parquet(*hour_paths)
+    # Rows written before sentiment_sq_sum/neutral_count existed read as null (or lack the column);
+    # reprocess those hours with PROCESSING_MODE=full to backfill them
+    for name in STATE_SUM_COLUMNS:
+        if name not in state.columns:
+            state = state.withColumn(name, functions.lit(None).cast("double" if name.endswith("_sum") else "long"))
+    state = state.select("source_key", "coin", "ts_hour", *STATE_SUM_COLUMNS) \
+        .dropDuplicates(["source_key", "coin", "ts_hour"])
+    return merge_sentiment_state(state), touched
+
+def load_seen_post_index(bucket: str, key: str = SEEN_POST_INDEX_KEY) -> dict:
+    s3 = boto3.client("s3", region_name=DYNAMODB_REGION)
+    try:
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except s3.exceptions.NoSuchKey:
+        return {}
+    return json.loads(body.decode("utf-8"))
+
+
+def drop_duplicate_posts(spark: SparkSession, reddit_df: DataFrame, partitions: List[str], seen_index: dict) -> DataFrame:
+    """
+    Keep one copy of each post id, and only if it is indexed under one of `partitions`.
+
+    Posts missing from the index (older raw data, extractor dedupe disabled) are kept.
+    """
+    df = reddit_df.dropDuplicates(["id"])
+    wanted = set(partitions)
+    elsewhere = [(post_id,) for post_id, post_partition in seen_index.items() if post_partition not in wanted]
+    if not elsewhere:
+        return df
+    counted_elsewhere = spark.createDataFrame(elsewhere, "id string")
+    return df.join(functions.broadcast(counted_elsewhere), on="id", how="left_anti")
+
+
+def parse_input_path(input_s3: str):
+    """Split s3://bucket/raw/reddit/cryptocurrency/YYYY/MM/DD/HH into (bucket, "YYYY/MM/DD/HH")."""
     path_parts = input_s3.rstrip('/').split('/')
-    year, month, day, hour = path_parts[-4:]
-    bucket = path_parts[2]  # Extract bucket name from s3://bucket/...
-    coingecko_path = f"s3://{bucket}/raw/coingecko/*/{year}/{month}/{day}/{hour}"
-    
-    
+    return path_parts[2], "/".join(path_parts[-4:])
 
-    df = spark.read.option("recursiveFileLookup", "true") \
-         .option("mode", "PERMISSIVE") \
-         .option("columnNameOfCorruptRecord", "corrupt_record") \
-         .json(coingecko_path)
-    
-    df = df.withColumn("price_timestamp", functions.to_timestamp("timestamp")) \
-           .filter(functions.col("price_timestamp").isNotNull())
 
-    filtered_count = df.count()
+def raw_input_path(bucket: str, partition: str) -> str:
+    return f"s3://{bucket}/{RAW_REDDIT_PATH}/{partition}"
+
 
+def read_partitions(spark: SparkSession, bucket: str, source: str, partitions: List[str], schema) -> DataFrame:
+    """Read and union the given hour partitions of a raw source (compacted form when available)."""
+    frames = [
+        read_hour(
+            spark, f"s3://{bucket}", source, partition, schema, RAW_INPUT_FORMAT,
+            corrupt_output_path=f"s3://{bucket}/{CORRUPT_RECORDS_PATH}/{source.split('/')[0]}/{partition}",
+        )
+        for partition in partitions
+    ]
+    df = frames[0]
+    for frame in frames[1:]:
+        df = df.unionByName(frame)
+    return df
+
+
+def load_coingecko_data(spark: SparkSession, input_s3) -> DataFrame:
+    """Hourly average price and OHLC per coin for one raw input path or a list of them."""
+    inputs = [input_s3] if isinstance(input_s3, str) else input_s3
+    bucket = parse_input_path(inputs[0])[0]
     schema = types.StructType([
         types.StructField("coin", types.StringType()),
         types.StructField("ts_hour", types.TimestampType()),
         types.StructField("price_usd", types.DoubleType()),
         types.StructField("price_sample_count", types.LongType()),
+        types.StructField("price_sum", types.DoubleType()),
+        types.StructField("price_open", types.DoubleType()),
+        types.StructField("price_high", types.DoubleType()),
+        types.StructField("price_low", types.DoubleType()),
+        types.StructField("price_close", types.DoubleType()),
     ])
-    if filtered_count == 0:
+    # Hours outside the job's inputs may have no price objects at all
+    partitions = [
+        partition for partition in (parse_input_path(path)[1] for path in inputs)
+        if hour_exists(spark, f"s3://{bucket}", "coingecko", partition)
+    ]
+    if not partitions:
+        return spark.createDataFrame([], schema = schema)
+
+    df = read_partitions(spark, bucket, "coingecko", partitions, COINGECKO_PRICE_SCHEMA)
+    
+    df = df.withColumn("price_timestamp", functions.to_timestamp("timestamp")) \
+           .filter(functions.col("price_timestamp").isNotNull())
+
+    if not df.head(1):
         return spark.createDataFrame([], schema = schema)
 
     
     df = df.withColumn("ts_hour", functions.date_trunc("hour", "price_timestamp")) \
            .groupBy("coin", "ts_hour") \
-           .agg(functions.avg("price_usd").alias("price_usd"), functions.count("*").alias("price_sample_count")) \
-           .orderBy("coin", "ts_hour")
+           .agg(functions.avg("price_usd").alias("price_usd"),
+                functions.count("*").alias("price_sample_count"),
+                functions.sum("price_usd").alias("price_sum"),
+                functions.expr("min_by(price_usd, price_timestamp)").alias("price_open"),
+                functions.max("price_usd").alias("price_high"),
+                functions.min("price_usd").alias("price_low"),
+                functions.expr("max_by(price_usd, price_timestamp)").alias("price_close"))
 
     return df
 
 
-def join_sentiment_with_price(reddit_df: DataFrame, price_df: DataFrame):
+def price_hours(partitions: List[str], mode: str = PRICE_JOIN_MODE,
+                max_staleness_hours: int = PRICE_ASOF_MAX_STALENESS_HOURS) -> List[str]:
+    """Hour partitions whose prices the join needs: the hours themselves, plus the lookback in "asof" mode."""
+    lookback = max_staleness_hours if mode == "asof" else 0
+    hours = set()
+    for partition in partitions:
+        start = datetime.strptime(partition, "%Y/%m/%d/%H")
+        hours.update((start - timedelta(hours=i)).strftime("%Y/%m/%d/%H") for i in range(lookback + 1))
+    return sorted(hours)
+
+
+def join_sentiment_with_price(reddit_df: DataFrame, price_df: DataFrame, mode: str = PRICE_JOIN_MODE,
+                              max_staleness_hours: int = PRICE_ASOF_MAX_STALENESS_HOURS):
+    """
+    Join hourly sentiment to hourly prices on (coin, ts_hour).
+
+    The price table is a handful of rows per coin, so it is always broadcast.
+    mode="exact" needs a price in the same hour; mode="asof" takes the latest
+    price hour at or before each sentiment hour, at most `max_staleness_hours`
+    earlier. `price_df` must cover that lookback (see price_hours), and hours
+    without a price inside it are dropped, as in "exact" mode.
+    """
+    if mode not in ("exact", "asof"):
+        raise ValueError(f"Unknown price join mode: {mode}")
+
     r = reddit_df.alias("r")
-    p = price_df.alias("p")
+    p = functions.broadcast(price_df).alias("p")
 
-    joined_df = r.join(p, on=["coin"], how="inner")
+    if mode == "exact":
+        joined_df = r.join(p, on=["coin", "ts_hour"], how="inner")
+    else:
+        candidates = r.join(
+            p,
+            (functions.col("r.coin") == functions.col("p.coin"))
+            & (functions.col("p.ts_hour") <= functions.col("r.ts_hour"))
+            & (functions.col("p.ts_hour") >= functions.col("r.ts_hour")
+               - functions.expr(f"INTERVAL {int(max_staleness_hours)} HOURS")),
+            how="inner",
+        )
+        latest_first = Window.partitionBy(functions.col("r.coin"), functions.col("r.ts_hour")) \
+            .orderBy(functions.col("p.ts_hour").desc())
+        joined_df = candidates \
+            .withColumn("price_rank", functions.row_number().over(latest_first)) \
+            .filter(functions.col("price_rank") == 1)
 
     joined = joined_df.select(
-        functions.col("coin"),
+        functions.col("r.coin").alias("coin"),
+        functions.col("r.ts_hour").alias("ts_hour"),
         functions.col("p.price_usd").alias("price_usd"),
         functions.col("p.price_sample_count").alias("price_sample_count"),
         functions.col("r.sentiment_label").alias("sentiment_label"),
@@ -201,72 +729,297 @@ def join_sentiment_with_price(reddit_df: DataFrame, price_df: DataFrame):
     )
     return joined
 
-def write_to_dynamodb(rows: list, table_name: str):
-    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-    table = dynamodb.Table(table_name)
-    current_ts = datetime.utcnow().isoformat()
-    for row in rows:
-        item = {
-            'coin': str(row['coin']),
-            'current_ts': str(current_ts),
-            'price_usd': Decimal(row['price_usd']),
-            'price_sample_count': int(row['price_sample_count']),
-            'sentiment_label': str(row['sentiment_label']),
-            'sentiment_score': Decimal(row['sentiment_score']),
-        }
-        table.put_item(TableName=table_name, Item=item)
-
-
-def run_job(input_s3: str, output_s3: str):
+def _to_dynamodb_item(row) -> dict:
+    # Both price joins are inner, so every row has a price
+    item = {
+        'coin': str(row['coin']),
+        'current_ts': str(row['current_ts']),
+        'price_usd': Decimal(row['price_usd']),
+        'price_sample_count': int(row['price_sample_count']),
+        'sentiment_label': str(row['sentiment_label']),
+    }
+    # finalize_sentiment has no score for hours without a scored post; leave the attribute out, not NULL
+    if row['sentiment_score'] is not None:
+        item['sentiment_score'] = Decimal(row['sentiment_score'])
+    return item
+
+
+def _to_rollup_item(row) -> dict:
+    # Unknown prices (no CoinGecko sample in the bucket) are left out rather than stored as NULL
+    return {
+        name: value if isinstance(value, (str, int)) else Decimal(str(value))
+        for name, value in row.asDict().items()
+        if value is not None
+    }
+
+
+def _batch_write_with_retry(client, table_name: str, requests: list, max_retries: int):
+    """Send one BatchWriteItem call, resending UnprocessedItems with jittered exponential backoff."""
+    import random
+    import time
+
+    attempt = 0
+    while requests:
+        response = client.batch_write_item(RequestItems={table_name: requests})
+        requests = response.get("UnprocessedItems", {}).get(table_name, [])
+        if not requests:
+            return
+        attempt += 1
+        if attempt > max_retries:
+            raise RuntimeError(
+                f"{len(requests)} items still unprocessed by {table_name} after {max_retries} retries"
+            )
+        time.sleep(min(DYNAMODB_MAX_BACKOFF_SECONDS, 0.05 * 2 ** attempt) * random.uniform(0.5, 1.0))
+
+
+def build_dynamodb_partition_writer(table_name: str,
+                                    to_item=_to_dynamodb_item,
+                                    key_names=("coin", "current_ts"),
+                                    region_name: str = DYNAMODB_REGION,
+                                    endpoint_url: str = DYNAMODB_ENDPOINT_URL,
+                                    concurrency: int = DYNAMODB_WRITE_CONCURRENCY,
+                                    max_retries: int = DYNAMODB_MAX_RETRIES):
+    """
+    Build a foreachPartition function that writes rows in BatchWriteItem groups
+    of 25, with up to `concurrency` batches in flight per partition.
+
+    `to_item` turns a row into an item and `key_names` are the table's key attributes.
+    """
+    if concurrency <= 0:
+        raise ValueError("DynamoDB write concurrency must be a positive integer")
+
+    def write_partition(rows):
+        from concurrent.futures import ThreadPoolExecutor
+        from boto3.dynamodb.types import TypeSerializer
+        from botocore.config import Config
+
+        client = boto3.client(
+            "dynamodb",
+            region_name=region_name,
+            endpoint_url=endpoint_url,
+            config=Config(
+                retries={"max_attempts": 10, "mode": "standard"},
+                max_pool_connections=max(10, concurrency),
+            ),
+        )
+        serializer = TypeSerializer()
+
+        def to_requests(items: dict) -> list:
+            return [
+                {"PutRequest": {"Item": {k: serializer.serialize(v) for k, v in item.items()}}}
+                for item in items.values()
+            ]
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = []
+            # Keyed by primary key: BatchWriteItem rejects duplicate keys within one request
+            pending = {}
+            for row in rows:
+                item = to_item(row)
+                pending[tuple(item[name] for name in key_names)] = item
+                if len(pending) == DYNAMODB_BATCH_SIZE:
+                    futures.append(pool.submit(_batch_write_with_retry, client, table_name, to_requests(pending), max_retries))
+                    pending = {}
+            if pending:
+                futures.append(pool.submit(_batch_write_with_retry, client, table_name, to_requests(pending), max_retries))
+            for future in futures:
+                future.result()
+
+    return write_partition
+
+
+def write_to_dynamodb(df: DataFrame, table_name: str, to_item=_to_dynamodb_item, key_names=("coin", "current_ts")):
+    """
+    Write rows to DynamoDB from the executors; nothing is collected on the driver.
+
+    `current_ts` is the row's hour, so re-running an hour overwrites its items.
+    """
+    df.foreachPartition(build_dynamodb_partition_writer(table_name, to_item, key_names))
+
+
+def build_hourly_rollups(state: DataFrame, price_df: DataFrame) -> DataFrame:
+    """
+    One rollup row per (coin, hour): the merged sentiment state plus the hour's price OHLC.
+
+    Hours with no price keep null OHLC and contribute no correlation point.
+    """
+    df = state.join(functions.broadcast(price_df), on=["coin", "ts_hour"], how="left")
+    price_avg = functions.col("price_sum") / functions.col("price_sample_count")
+    score_avg = functions.when(functions.col("scored_count") > 0, functions.col("sentiment_sum") / functions.col("scored_count"))
+    paired = price_avg.isNotNull() & score_avg.isNotNull()
+
+    def point(value: Column, name: str) -> Column:
+        return functions.when(paired, value).otherwise(functions.lit(0.0)).alias(name)
+
+    return df.select(
+        "coin", "ts_hour", *STATE_SUM_COLUMNS,
+        functions.coalesce(functions.col("price_sum"), functions.lit(0.0)).alias("price_sum"),
+        functions.coalesce(functions.col("price_sample_count"), functions.lit(0)).cast("long").alias("price_sample_count"),
+        "price_open", "price_high", "price_low", "price_close",
+        functions.when(paired, 1).otherwise(0).cast("long").alias("point_count"),
+        point(price_avg, "point_price_sum"),
+        point(price_avg * price_avg, "point_price_sq_sum"),
+        point(score_avg, "point_score_sum"),
+        point(score_avg * score_avg, "point_score_sq_sum"),
+        point(price_avg * score_avg, "point_cross_sum"),
+    )
+
+
+def build_daily_rollups(spark: SparkSession, hourly_path: str, days: List[str]) -> DataFrame:
+    """Merge the stored hourly rollups of each (coin, day) in `days` ("YYYY/MM/DD")."""
+    day_paths = []
+    for day in days:
+        year, month, dd = day.split("/")
+        day_paths.append(f"{hourly_path}/year={year}/month={month}/day={dd}")
+    hourly = spark.read.option("basePath", hourly_path).parquet(*day_paths)
+
+    def first_or_last(agg: str, name: str) -> Column:
+        # Ordering by null for hours without a price makes min_by/max_by skip them
+        return functions.expr(f"{agg}({name}, CASE WHEN {name} IS NOT NULL THEN ts_hour END)").alias(name)
+
+    return hourly.withColumn("ts_day", functions.date_trunc("day", "ts_hour")) \
+        .groupBy("coin", "ts_day") \
+        .agg(
+            *[functions.sum(name).alias(name) for name in ROLLUP_SUM_COLUMNS],
+            first_or_last("min_by", "price_open"),
+            functions.max("price_high").alias("price_high"),
+            functions.min("price_low").alias("price_low"),
+            first_or_last("max_by", "price_close"),
+        ) \
+        .withColumnRenamed("ts_day", "ts_hour")
+
+
+def rollup_items(rollups: DataFrame, granularity: str) -> DataFrame:
+    """Key rollups as series = "<coin>#<granularity>", bucket_ts = bucket start (UTC)."""
+    return rollups.select(
+        functions.concat(functions.col("coin"), functions.lit(f"#{granularity}")).alias("series"),
+        functions.date_format("ts_hour", "yyyy-MM-dd'T'HH:mm:ss").alias("bucket_ts"),
+        functions.lit(granularity).alias("granularity"),
+        "coin", *ROLLUP_SUM_COLUMNS, "price_open", "price_high", "price_low", "price_close",
+    )
+
+
+def update_rollups(spark: SparkSession, bucket: str, state: DataFrame, price_df: DataFrame):
+    """
+    Rewrite the hourly rollups of the touched hours and the daily rollups of their days.
+
+    Hourly rollups are also kept as Parquet (one partition per hour, dynamically
+    overwritten) so a day is re-merged from its stored hours, not from raw data.
+    """
+    hourly_path = f"s3a://{bucket}/{HOURLY_ROLLUP_PATH}"
+    hourly = build_hourly_rollups(state, price_df).cache()
+    with_partition_columns(hourly).repartition("year", "month", "day", "hour").write \
+        .mode("overwrite").option("partitionOverwriteMode", "dynamic") \
+        .partitionBy("year", "month", "day", "hour").parquet(hourly_path)
+    days = [row.day for row in hourly.select(functions.date_format("ts_hour", "yyyy/MM/dd").alias("day")).distinct().collect()]
+    if not days:
+        hourly.unpersist()
+        return
+
+    daily = build_daily_rollups(spark, hourly_path, days)
+    for granularity, rollups in (("hour", hourly), ("day", daily)):
+        write_to_dynamodb(rollup_items(rollups, granularity), ROLLUP_TABLE_NAME,
+                          to_item=_to_rollup_item, key_names=("series", "bucket_ts"))
+    hourly.unpersist()
+    print(f"Updated rollups for {len(days)} day(s) in {ROLLUP_TABLE_NAME}")
+
+
+def run_job(input_s3, output_s3: str, mode: str = PROCESSING_MODE):
+    """
+    Score, aggregate and join one or more raw hour partitions in a single Spark session.
+
+    `input_s3` is a raw Reddit hour path or a list of them; every hour is
+    scored in one pass and written to the year/month/day/hour of its data.
+    In "incremental" mode only raw objects missing from a partition's
+    manifest are read, from the compacted hour when it holds them; their aggregates are merged into the hourly state and
+    every touched hour of processed/joined is overwritten, so repeated
+    triggers neither rescore posts nor duplicate rows.
+    """
+    if mode not in ("incremental", "full"):
+        raise ValueError(f"Unknown processing mode: {mode}")
     spark = initialize_spark("SentimentAndJoin")
-    
-    reddit_df = spark.read.option("recursiveFileLookup", "true").json(input_s3)
-    sentiment_udf = build_sentiment_udf()
-    reddit_sentiment_df = reddit_df.withColumn(
-        "sentiment",
-        sentiment_udf(col("text"))
-    ).select(
-        "*",
-        col("sentiment.sentiment_label").alias("sentiment_label"),
-        col("sentiment.sentiment_score").alias("sentiment_score"))
+
+    inputs = [input_s3] if isinstance(input_s3, str) else list(input_s3)
+    bucket = parse_input_path(inputs[0])[0]
+    partitions = [parse_input_path(path)[1] for path in inputs]
+    print(f"Processing {len(partitions)} partition(s) in {mode} mode: {', '.join(partitions)}")
+
+    if mode == "incremental":
+        processed = {partition: load_processed_keys(spark, bucket, partition) for partition in partitions}
+        new_files = {partition: new_raw_files(spark, bucket, partition, processed[partition]) for partition in partitions}
+        print(f"New raw objects: { {partition: len(paths) for partition, paths in new_files.items()} }")
+        if not any(new_files.values()):
+            print("Every raw object is already processed; nothing to do")
+            spark.stop()
+            return
+        reddit_df = read_new_reddit_files(spark, bucket, new_files)
+    else:
+        # Uses the compacted hour (compact_raw.py) when it exists
+        reddit_df = read_partitions(spark, bucket, "reddit/cryptocurrency", partitions, REDDIT_POST_SCHEMA)
+    if POST_DEDUPE_ENABLED:
+        reddit_df = drop_duplicate_posts(spark, reddit_df, partitions, load_seen_post_index(bucket))
+    padding_metrics = create_padding_metrics(spark)
+    sentiment_udf = build_sentiment_udf(padding_metrics=padding_metrics)
+    scored_misses = None
+    if SENTIMENT_CACHE_ENABLED:
+        reddit_sentiment_df, scored_misses = apply_sentiment_with_cache(
+            spark, reddit_df, sentiment_udf, cache_path=f"s3a://{bucket}/{SENTIMENT_CACHE_PATH}/"
+        )
+    else:
+        reddit_sentiment_df = apply_sentiment(reddit_df, sentiment_udf)
     
     reddit_prepared = prepare_reddit(reddit_sentiment_df)
-    reddit_agg = aggregate_sentiment(reddit_prepared)
-    price_df = load_coingecko_data(spark, input_s3)
+    if mode == "incremental":
+        delta = aggregate_sentiment_state(reddit_prepared, keys=["source_key"])
+        state, touched = update_hourly_state(spark, delta, f"s3a://{bucket}/{HOURLY_STATE_PATH}/")
+        reddit_agg = finalize_sentiment(state)
+        # Posts can belong to hours outside the inputs; those hours need their prices too
+        sentiment_hours = set(partitions) | set(touched)
+    else:
+        reddit_agg = aggregate_sentiment(reddit_prepared)
+        sentiment_hours = set(partitions)
+    price_df = load_coingecko_data(spark, [raw_input_path(bucket, hour) for hour in price_hours(sorted(sentiment_hours))])
 
     joined = join_sentiment_with_price(reddit_agg, price_df)
-    path_parts = input_s3.rstrip('/').split('/')
-    bucket = path_parts[2]
-    year, month, day, hour = path_parts[-4:]
-    output_path = f"s3a://{bucket}/processed/joined/"
-
-    out = (
-        joined
-        .withColumn("year", functions.lit(year))
-        .withColumn("month", functions.lit(month))
-        .withColumn("day", functions.lit(day))
-        .withColumn("hour", functions.lit(hour))
-    )
+    output_path = f"s3a://{bucket}/{JOINED_OUTPUT_PATH}/"
+
+    out = with_partition_columns(joined)
     out.cache()
-    (out
-        .repartition("coin", "year", "month", "day", "hour")
-           .write
-           .mode("append")
-           .partitionBy("coin", "year", "month", "day", "hour")
-           .parquet(output_path)
-    )
+    writer = out.repartition("coin", "year", "month", "day", "hour").write
+    if mode == "incremental":
+        # Replaces only the (coin, hour) partitions present in `out`
+        writer = writer.mode("overwrite").option("partitionOverwriteMode", "dynamic")
+    else:
+        writer = writer.mode("append")
+    writer.partitionBy("coin", "year", "month", "day", "hour").parquet(output_path)
+    if scored_misses is not None:
+        # `out` is cached by the write above, so the remaining writes no longer read the misses
+        scored_misses.unpersist()
     output = out.select(functions.col("coin"),
+                        functions.date_format("ts_hour", "yyyy-MM-dd'T'HH:mm:ss").alias("current_ts"),
                         functions.col("price_usd").cast("string").alias("price_usd"),
                         functions.col("price_sample_count"),
                         functions.col("sentiment_label"),
-                        functions.col("sentiment_score").cast("string").alias("sentiment_score")).collect()
-    write_to_dynamodb(output, table_name="sparkling-water-dev-crypto-sentiment")
+                        functions.col("sentiment_score").cast("string").alias("sentiment_score"))
+    write_to_dynamodb(output, table_name=DYNAMODB_TABLE_NAME)
+    if mode == "incremental" and ROLLUPS_ENABLED:
+        # Full mode appends partial hours, so only the merged incremental state can feed rollups
+        update_rollups(spark, bucket, state, price_df)
+
+    if mode == "incremental":
+        # Last, so a failed run leaves its objects unprocessed and the next trigger retries them
+        for partition, paths in new_files.items():
+            if paths:
+                save_processed_keys(spark, bucket, partition, processed[partition] | {object_key(path) for path in paths})
+    release_raw_reads()
+    report_padding_metrics(padding_metrics)
     print(f"Wrote joined data to {output_path}")
     spark.stop()
 
 def main():
     # Example input: s3://sparkling-water-dev-data-bucket/raw/reddit/cryptocurrency/2025/11/25/21
-    input_s3 = sys.argv[1]
+    # Several hours are passed comma separated and processed in one run
+    input_s3 = [path for path in sys.argv[1].split(",") if path]
     output_s3 = sys.argv[2]
 
     run_job(input_s3, output_s3)
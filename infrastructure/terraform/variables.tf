@@ -22,6 +22,12 @@ variable "data_extraction_schedule" {
   default     = "rate(5 minutes)"
 }
 
+variable "task_manager_schedule" {
+  description = "CloudWatch Events schedule expression for submitting debounced partitions"
+  type        = string
+  default     = "rate(5 minutes)"
+}
+
 variable "ingestor_package_name" {
   description = "Name of the package to be used in Lambda functions"
   type        = string